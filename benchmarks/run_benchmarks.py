@@ -0,0 +1,291 @@
+"""Benchmarks of the data steps pipeline engine.
+
+Builds synthetic pipelines with different numbers of steps over frames
+with different numbers of rows and dtype mixes, times the main entry
+points of DataSteps and writes the results as JSON, such that results
+of different releases can be compared.
+
+Usage, with data_steps installed, e.g. with pip install -e . in the
+repository root:
+    python benchmarks/run_benchmarks.py --steps 1 10 200 --rows 1000 1000000 \
+        --output benchmark_results.json
+
+    # per call overhead of applying pipelines to frames of 10 rows, reported
+    # relative to calling the step functions directly
+    python benchmarks/run_benchmarks.py --steps 10 200 --overhead-calls 1000
+
+    # compare against the results of a previous release and exit with
+    # a non-zero status if any benchmark got slower by more than 20%
+    python benchmarks/run_benchmarks.py --compare baseline.json --threshold 1.2
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import data_steps
+from data_steps import DataSteps
+
+DTYPE_MIXES = ["numeric", "mixed", "strings"]
+TINY_ROWS = 10
+# Reference timings of pandas without the engine, not compared between runs
+REFERENCE_BENCHMARKS = {"direct_per_call"}
+
+
+def build_frame(n_rows: int, dtype_mix: str, seed: int = 0) -> pd.DataFrame:
+    """Synthetic frame with four numeric and/or four string columns."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    if dtype_mix in ("numeric", "mixed"):
+        columns["int_0"] = rng.integers(0, 1000, n_rows)
+        columns["int_1"] = rng.integers(0, 10, n_rows).astype("int32")
+        columns["float_0"] = rng.random(n_rows)
+        columns["float_1"] = rng.normal(size=n_rows)
+    if dtype_mix in ("strings", "mixed"):
+        labels = np.array([f"label_{n}" for n in range(100)])
+        columns["str_0"] = labels[rng.integers(0, 100, n_rows)]
+        columns["str_1"] = pd.Categorical(labels[rng.integers(0, 10, n_rows)])
+        if dtype_mix == "strings":
+            columns["str_2"] = labels[rng.integers(0, 50, n_rows)]
+            columns["str_3"] = labels[rng.integers(0, 5, n_rows)]
+    return pd.DataFrame(columns)
+
+
+def _numeric_step(n):
+    def step(frame, factor=n + 1):
+        return frame.assign(**{f"result_{n % 4}": frame["float_0"] * factor + frame["int_0"]})
+
+    return step
+
+
+def _string_step(n):
+    default_suffix = str(n)
+
+    def step(frame, suffix=default_suffix):
+        return frame.assign(**{f"result_{n % 4}": frame["str_0"] + suffix})
+
+    return step
+
+
+def _summary_step(n):
+    def step(frame):
+        return frame, frame.shape
+
+    return step
+
+
+def build_steps(n_steps: int, frame: pd.DataFrame) -> list:
+    """Functions of n_steps column assignments with some secondary results.
+
+    Every tenth step returns a secondary result. Other steps compute a
+    numeric or string column, depending on the columns of the frame.
+
+    Returns:
+        List of (function, has_secondary_result) pairs in order.
+    """
+    has_strings = "str_0" in frame
+    has_numbers = "float_0" in frame
+    steps = []
+    for n in range(n_steps):
+        if n % 10 == 9:
+            function, has_secondary_result = _summary_step(n), True
+        elif has_numbers and (not has_strings or n % 2 == 0):
+            function, has_secondary_result = _numeric_step(n), False
+        else:
+            function, has_secondary_result = _string_step(n), False
+        function.__name__ = f"step_{n}"
+        steps.append((function, has_secondary_result))
+    return steps
+
+
+def build_pipeline(n_steps: int, frame: pd.DataFrame) -> DataSteps:
+    """Pipeline of the steps of build_steps."""
+    pipeline = DataSteps(frame)
+    for n, (function, has_secondary_result) in enumerate(build_steps(n_steps, frame)):
+        pipeline.step(function, priority=n, has_secondary_result=has_secondary_result)
+    return pipeline
+
+
+def apply_directly(steps: list, frame: pd.DataFrame) -> pd.DataFrame:
+    """Calls the functions of build_steps in order, the baseline without the engine."""
+    for function, has_secondary_result in steps:
+        frame = function(frame)
+        if has_secondary_result:
+            frame = frame[0]
+    return frame
+
+
+def time_call(function, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "repeat": repeat}
+
+
+def benchmark_pipeline(pipeline: DataSteps, n_steps: int, repeat: int) -> dict:
+    return {
+        "transformed": time_call(lambda: pipeline.transformed, repeat),
+        "partial_transform": time_call(lambda: pipeline.partial_transform(n_steps // 2), repeat),
+        "secondary_results": time_call(lambda: pipeline.secondary_results, repeat),
+        "steps_overview": time_call(lambda: pipeline.steps, repeat),
+        "export": time_call(
+            lambda: str(pipeline.export("pipeline", without_data_steps=True)), repeat
+        ),
+    }
+
+
+def benchmark_overhead(
+    pipeline: DataSteps, steps: list, frame: pd.DataFrame, calls: int, repeat: int
+) -> dict:
+    """Time per call of many calls on a tiny frame, dominated by per call overhead.
+
+    direct_per_call calls the step functions without the engine, such
+    that the overhead of the engine is the difference to it.
+    """
+
+    def per_call(function):
+        def call_many():
+            for _ in range(calls):
+                function()
+
+        timing = time_call(call_many, repeat)
+        return {**timing, "min": timing["min"] / calls, "median": timing["median"] / calls}
+
+    return {
+        "direct_per_call": per_call(lambda: apply_directly(steps, frame)),
+        "apply_per_call": per_call(lambda: pipeline.apply(frame)),
+        "transformed_per_call": per_call(lambda: pipeline.transformed),
+    }
+
+
+def environment() -> dict:
+    return {
+        "data_steps": data_steps.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _result(benchmark, n_rows, n_steps, dtype_mix, timing):
+    return {
+        "benchmark": benchmark,
+        "rows": n_rows,
+        "steps": n_steps,
+        "dtype_mix": dtype_mix,
+        **timing,
+    }
+
+
+def run_benchmarks(steps, rows, dtype_mixes, repeat: int, overhead_calls: int = 0):
+    results = []
+    for n_rows in rows:
+        for dtype_mix in dtype_mixes:
+            frame = build_frame(n_rows, dtype_mix)
+            for n_steps in steps:
+                pipeline = build_pipeline(n_steps, frame)
+                timings = benchmark_pipeline(pipeline, n_steps, repeat)
+                for benchmark, timing in timings.items():
+                    results.append(_result(benchmark, n_rows, n_steps, dtype_mix, timing))
+                print(
+                    f"rows={n_rows} dtypes={dtype_mix} steps={n_steps} "
+                    f"transformed={timings['transformed']['min']:.4f}s",
+                    file=sys.stderr,
+                )
+    if overhead_calls:
+        for dtype_mix in dtype_mixes:
+            frame = build_frame(TINY_ROWS, dtype_mix)
+            for n_steps in steps:
+                pipeline = build_pipeline(n_steps, frame)
+                timings = benchmark_overhead(
+                    pipeline, build_steps(n_steps, frame), frame, overhead_calls, repeat
+                )
+                for benchmark, timing in timings.items():
+                    results.append(_result(benchmark, TINY_ROWS, n_steps, dtype_mix, timing))
+                direct = timings["direct_per_call"]["min"]
+                print(
+                    f"rows={TINY_ROWS} dtypes={dtype_mix} steps={n_steps} "
+                    f"direct={direct * 1e6:.1f}us "
+                    f"apply={timings['apply_per_call']['min'] / direct:.2f}x "
+                    f"transformed={timings['transformed_per_call']['min'] / direct:.2f}x",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def _key(result):
+    return (result["benchmark"], result["rows"], result["steps"], result["dtype_mix"])
+
+
+def compare(baseline, results, threshold: float):
+    """Benchmarks whose minimal time grew by more than threshold times the baseline.
+
+    Reference benchmarks only time pandas, so they are left out.
+    """
+    baseline_times = {_key(result): result["min"] for result in baseline}
+    regressions = []
+    for result in results:
+        if result["benchmark"] in REFERENCE_BENCHMARKS:
+            continue
+        before = baseline_times.get(_key(result))
+        if before and result["min"] / before > threshold:
+            regressions.append({**result, "baseline_min": before, "ratio": result["min"] / before})
+    return regressions
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--steps", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--dtypes", nargs="+", default=DTYPE_MIXES, choices=DTYPE_MIXES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--overhead-calls",
+        type=int,
+        default=100,
+        help=f"calls per repetition of the per call overhead benchmarks on {TINY_ROWS} rows",
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="results file of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_args(args)
+    report = {
+        "environment": environment(),
+        "results": run_benchmarks(
+            args.steps, args.rows, args.dtypes, args.repeat, args.overhead_calls
+        ),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, report["results"], args.threshold)
+        for regression in regressions:
+            print(
+                f"Regression {regression['benchmark']} rows={regression['rows']} "
+                f"steps={regression['steps']} dtypes={regression['dtype_mix']}: "
+                f"{regression['baseline_min']:.4f}s -> {regression['min']:.4f}s",
+                file=sys.stderr,
+            )
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from .cache import ResultCache  # noqa: F401
 from .single_frame import DataSteps  # noqa: F401
 
 with open(Path(__file__).parent / "VERSION") as f:
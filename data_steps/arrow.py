@@ -0,0 +1,162 @@
+import ctypes
+from dataclasses import dataclass
+
+import pandas as pd
+
+OUTPUTS = ("pandas", "arrow")
+
+
+class ArrowRoundTripError(ValueError):
+    """Raised if data would not be read back from Arrow as it was written."""
+
+
+def require_pyarrow(feature: str):
+    """Raises an informative ImportError if pyarrow is not installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(
+            f"{feature} require pyarrow. Install it with `pip install data-steps[arrow]`."
+        ) from error
+
+
+def restores_frame(frame: pd.DataFrame, table) -> bool:
+    """Whether a table converted from frame is read back with the same dtypes and index.
+
+    E.g. object columns of integers and None are read back as float64
+    and a DatetimeIndex loses its freq.
+    """
+    # Reading no rows gives the dtypes without converting the data
+    restored = table.slice(0, 0).to_pandas()
+    return (
+        restored.dtypes.equals(frame.dtypes)
+        and restored.index.dtype == frame.index.dtype
+        and getattr(frame.index, "freq", None) is None
+    )
+
+
+def _is_arrow_data(data) -> bool:
+    if isinstance(data, (pd.DataFrame, pd.Series, pd.Index)):
+        # pandas objects support the protocols as well, but are used as they are
+        return False
+    return (
+        type(data).__module__.split(".")[0] == "pyarrow"
+        or hasattr(data, "__arrow_c_stream__")
+        or hasattr(data, "__dataframe__")
+    )
+
+
+def as_frame(data):
+    """Frame of a pyarrow Table or RecordBatch or another dataframe object.
+
+    Columns of Arrow data are wrapped in Arrow backed pandas dtypes,
+    which reuse the Arrow buffers instead of copying them. Other
+    dataframes are converted to Arrow first, via the Arrow PyCapsule
+    stream or the dataframe interchange protocol, without copying
+    where the protocol allows it.
+    pandas objects and any other data, e.g. NumPy arrays, are returned
+    as they are.
+    """
+    if not _is_arrow_data(data):
+        return data
+    require_pyarrow("Arrow and dataframe interchange inputs")
+    import pyarrow as pa
+
+    if isinstance(data, pa.RecordBatch):
+        data = pa.Table.from_batches([data])
+    elif isinstance(data, pa.Table):
+        pass
+    elif hasattr(data, "__arrow_c_stream__"):
+        data = pa.table(data)
+    elif hasattr(data, "__dataframe__"):
+        import pyarrow.interchange
+
+        data = pyarrow.interchange.from_dataframe(data)
+    else:
+        return data
+    return data.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def to_table(frame: pd.DataFrame):
+    """pyarrow Table of a frame, reusing the buffers of Arrow backed columns."""
+    require_pyarrow("Arrow outputs")
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(frame)
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Handle of a frame stored as Arrow IPC stream in shared memory.
+
+    Handles are cheap to pickle, such that frames can be passed
+    between processes without serialising their content.
+    """
+
+    name: str
+    size: int
+
+
+def _write_stream(sink, table) -> int:
+    import pyarrow as pa
+
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.tell()
+
+
+def to_shared_memory(frame) -> SharedFrame:
+    """Writes a frame into a new shared memory block.
+
+    The block is not released by this function. The receiver
+    is responsible to release it with release_shared_memory.
+
+    Raises:
+        ArrowRoundTripError: If the frame would be read back with
+            other dtypes, see restores_frame.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame)
+    if not restores_frame(frame, table):
+        raise ArrowRoundTripError(
+            "Data is not exchanged through Arrow without changing its dtypes or index"
+        )
+    size = _write_stream(pa.MockOutputStream(), table)
+    shared_memory = SharedMemory(create=True, size=max(size, 1))
+    _write_stream(pa.FixedSizeBufferWriter(pa.py_buffer(shared_memory.buf)), table)
+    shared_memory.close()
+    return SharedFrame(shared_memory.name, size)
+
+
+def read_shared_memory(handle: SharedFrame):
+    """Reads a frame written by to_shared_memory.
+
+    The Arrow data is read directly from the shared memory block.
+    Columns stored in numpy arrays are copied out of it once by the
+    conversion to pandas, Arrow backed columns keep referencing it.
+    The block stays mapped as long as they do, also after it was
+    released with release_shared_memory.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    import pyarrow as pa
+
+    shared_memory = SharedMemory(name=handle.name)
+    view = ctypes.c_char.from_buffer(shared_memory.buf)
+    address = ctypes.addressof(view)
+    del view
+    # The Arrow buffer owns the block, which is closed once no Arrow data references it
+    buffer = pa.foreign_buffer(address, handle.size, base=shared_memory)
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+def release_shared_memory(handle: SharedFrame):
+    """Releases a shared memory block that is no longer needed."""
+    from multiprocessing.shared_memory import SharedMemory
+
+    shared_memory = SharedMemory(name=handle.name)
+    shared_memory.close()
+    shared_memory.unlink()
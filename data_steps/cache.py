@@ -0,0 +1,223 @@
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from data_steps.fingerprint import _value_fingerprint, content_fingerprint
+
+
+def estimate_size(data) -> int:
+    """Approximate number of bytes held by data."""
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True))
+    return sys.getsizeof(data)
+
+
+def _freeze(value):
+    try:
+        hash(value)
+    except TypeError:
+        # The content is hashed, as arrays and frames may be changed in place
+        return (type(value), _value_fingerprint(value))
+    return (type(value), value)
+
+
+class LRUCache:
+    """Mapping with a byte budget that evicts least recently used entries.
+
+    Entries larger than the whole budget are not stored at all.
+    """
+
+    def __init__(self, max_bytes: int):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes currently held by the cache."""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def keys(self):
+        return list(self._entries)
+
+    def get(self, key, default=None):
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, key, value, size: int = None) -> bool:
+        """Stores value and returns whether it fit into the budget."""
+        if size is None:
+            size = estimate_size(value)
+        self.pop(key)
+        if size > self.max_bytes:
+            return False
+        self._entries[key] = (value, size)
+        self._nbytes += size
+        while self._nbytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._nbytes -= evicted_size
+        return True
+
+    def pop(self, key, default=None):
+        if key not in self._entries:
+            return default
+        value, size = self._entries.pop(key)
+        self._nbytes -= size
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+
+
+class PrefixCache(LRUCache):
+    """Cache of intermediate pipeline results per step prefix.
+
+    The key of a prefix is the tuple of the keys of all its steps. A step key
+    consists of the function object itself and its keyword arguments, so
+    redefining, removing or reparametrising a step only changes the keys of
+    the prefixes containing it, while all shorter prefixes stay valid.
+    Entries hold the data after the prefix together with the secondary
+    results collected up to that point.
+    """
+
+    @staticmethod
+    def step_key(step):
+        kwargs = tuple((name, _freeze(value)) for name, value in step.function_kwargs.items())
+        return (step.function, kwargs, step.has_secondary_result)
+
+    def prefix_keys(self, steps):
+        """Keys for all prefixes of steps, i.e. the nth key covers steps[: n + 1]."""
+        step_keys = [self.step_key(step) for step in steps]
+        return [tuple(step_keys[: n + 1]) for n in range(len(step_keys))]
+
+    def put(self, key, value, size: int = None) -> bool:
+        data, _ = value
+        return super().put(key, value, estimate_size(data) if size is None else size)
+
+    def longest_prefix(self, prefix_keys):
+        """Returns the number of covered steps and the entry of the longest cached prefix."""
+        for n in reversed(range(len(prefix_keys))):
+            entry = self.get(prefix_keys[n])
+            if entry is not None:
+                return n + 1, entry
+        return 0, None
+
+    def discard_stale(self, prefix_keys):
+        """Removes entries that are not a prefix of the given pipeline."""
+        valid = set(prefix_keys)
+        for key in self.keys():
+            if key not in valid:
+                self.pop(key)
+
+
+class ResultCache:
+    """Final results of pipelines keyed by the content of their input.
+
+    Keys combine a fingerprint of the input data with a fingerprint of
+    the pipeline, i.e. the code and keyword arguments of all steps, such
+    that the same cache can be shared by any number of DataSteps
+    instances. Entries hold the transformed data and the secondary
+    results. They are kept in memory up to a byte budget, evicting least
+    recently used entries first, and optionally written to a directory
+    as pickle files, which are shared between processes and not evicted.
+    The cache can be used from several threads.
+
+    The pipeline fingerprint covers global constants read by the steps,
+    like numbers and strings, but neither mutable globals like dicts or
+    frames nor globals read by functions the steps call. See
+    data_steps.fingerprint.step_fingerprint.
+
+    Args:
+        max_bytes (int): Byte budget of the entries held in memory.
+        directory (str or Path, optional): Directory for the disk backend.
+        sample_rows (int, optional): If set, inputs with more rows are
+            identified by a sample of this many rows and their shape,
+            see content_fingerprint.
+    """
+
+    SUFFIX = ".pkl"
+
+    def __init__(self, max_bytes: int, directory=None, sample_rows: int = None):
+        self._memory = LRUCache(max_bytes)
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.sample_rows = sample_rows
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Other processes start with an empty memory and only share the directory
+        return {
+            "max_bytes": self._memory.max_bytes,
+            "directory": self.directory,
+            "sample_rows": self.sample_rows,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def key(self, data, pipeline_fingerprint: str) -> str:
+        """Key of the results of a pipeline for the input data."""
+        return f"{pipeline_fingerprint[:32]}-{content_fingerprint(data, self.sample_rows)[:32]}"
+
+    def get(self, key: str):
+        """Returns the transformed data and secondary results or None if not cached."""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None or self.directory is None:
+            return entry
+        path = self.directory / f"{key}{self.SUFFIX}"
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        with self._lock:
+            self._memory.put(key, entry, estimate_size(entry[0]))
+        return entry
+
+    def put(self, key: str, transformed, secondary_results: dict) -> bool:
+        """Stores results and returns whether they are cached in memory.
+
+        Data cached in memory must not be modified afterwards.
+        """
+        entry = (transformed, dict(secondary_results))
+        if self.directory is not None:
+            path = self.directory / f"{key}{self.SUFFIX}"
+            # Unique temporary names as several processes may write the same entry
+            temporary_path = path.with_name(
+                f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temporary_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, path)
+        with self._lock:
+            return self._memory.put(key, entry, estimate_size(transformed))
+
+    def clear(self):
+        """Removes all entries from memory and the directory."""
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob(f"*{self.SUFFIX}"):
+                path.unlink()
@@ -0,0 +1,112 @@
+import os
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from data_steps.arrow import require_pyarrow, restores_frame
+
+
+class CheckpointStore:
+    """Directory of step results stored as uncompressed Feather files.
+
+    File names consist of the step name, a fingerprint of the code and
+    keyword arguments of the step and all steps before it, and a
+    fingerprint of the original data, i.e.
+    <step name>.<code fingerprint>.<data fingerprint>.feather
+    A checkpoint is stale if its code fingerprint no longer matches
+    the current pipeline.
+    """
+
+    SUFFIX = ".feather"
+    FINGERPRINT_LENGTH = 16
+
+    def __init__(self, directory):
+        require_pyarrow("Checkpoints")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, step_name: str, code_fingerprint: str, data_fingerprint: str) -> Path:
+        code_fingerprint = code_fingerprint[: self.FINGERPRINT_LENGTH]
+        data_fingerprint = data_fingerprint[: self.FINGERPRINT_LENGTH]
+        return self.directory / f"{step_name}.{code_fingerprint}.{data_fingerprint}{self.SUFFIX}"
+
+    def load(self, path: Path) -> pd.DataFrame:
+        """Reads a checkpoint into memory with the dtypes it was saved with."""
+        from pyarrow import feather
+
+        return feather.read_feather(str(path))
+
+    def save(self, path: Path, data) -> bool:
+        """Writes data as checkpoint and returns whether this succeeded.
+
+        Only DataFrames that can be converted to Arrow and are read
+        back with the same dtypes are written, e.g. strings of object
+        dtype are read back as str with pandas 3. Otherwise a warning
+        is issued. The file is written under a
+        temporary name first, such that interrupted writes never
+        leave partial checkpoints behind.
+        """
+        import pyarrow as pa
+        from pyarrow import feather
+
+        if not isinstance(data, pd.DataFrame):
+            warnings.warn(
+                f"Checkpoint {path.name} skipped, only DataFrames can be stored.", stacklevel=2
+            )
+            return False
+        try:
+            table = pa.Table.from_pandas(data)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as error:
+            warnings.warn(
+                f"Checkpoint {path.name} skipped, data not convertible to Arrow: {error}",
+                stacklevel=2,
+            )
+            return False
+        if not restores_frame(data, table):
+            warnings.warn(
+                f"Checkpoint {path.name} skipped, data not read back with the same dtypes.",
+                stacklevel=2,
+            )
+            return False
+
+        temporary_path = path.with_name(path.name + ".tmp")
+        feather.write_feather(table, str(temporary_path), compression="uncompressed")
+        os.replace(temporary_path, path)
+        return True
+
+    def checkpoints(self):
+        """All checkpoint files in the directory as (path, step name, code fingerprint)."""
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            parts = path.name[: -len(self.SUFFIX)].split(".")
+            if len(parts) == 3:
+                yield path, parts[0], parts[1]
+
+    def collect_garbage(self, code_fingerprints: dict, step_names=None) -> list:
+        """Deletes stale checkpoints.
+
+        Args:
+            code_fingerprints (dict): Current code fingerprint by step name
+                of all steps that are checkpointed. Checkpoints of other
+                steps or with other code fingerprints are deleted.
+            step_names (iterable, optional): If given, only checkpoints of
+                steps with these names are considered and checkpoints of
+                other steps, e.g. of other pipelines sharing the directory,
+                are kept.
+
+        Returns:
+            List of the deleted paths.
+        """
+        current = {
+            name: fingerprint[: self.FINGERPRINT_LENGTH]
+            for name, fingerprint in code_fingerprints.items()
+        }
+        considered = None if step_names is None else set(step_names)
+        deleted = []
+        for path, step_name, code_fingerprint in list(self.checkpoints()):
+            if considered is not None and step_name not in considered:
+                continue
+            if current.get(step_name) != code_fingerprint:
+                path.unlink()
+                deleted.append(path)
+        return deleted
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+REPORT_COLUMNS = ["dtype_before", "dtype_after", "bytes_before", "bytes_after", "bytes_saved"]
+STRING_TARGETS = ("category", "arrow", None)
+
+_INTEGER_FAMILIES = [
+    ["int8", "int16", "int32", "int64"],
+    ["uint8", "uint16", "uint32", "uint64"],
+    ["Int8", "Int16", "Int32", "Int64"],
+    ["UInt8", "UInt16", "UInt32", "UInt64"],
+]
+_FLOAT_TARGETS = {"float64": "float32", "Float64": "Float32"}
+
+
+def _integer_target(series: pd.Series):
+    name = series.dtype.name
+    family = next((family for family in _INTEGER_FAMILIES if name in family), None)
+    if family is None:
+        return None
+    values = series.dropna()
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for target in family[: family.index(name)]:
+        info = np.iinfo(target.lower())
+        if info.min <= low and high <= info.max:
+            return target
+    return None
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) == "string"
+
+
+def _string_target(series: pd.Series, strings: str, max_category_ratio: float):
+    if strings is None or not _is_string_column(series):
+        return None
+    if strings == "category":
+        if series.nunique(dropna=False) <= max_category_ratio * len(series):
+            return "category"
+        return None
+    if series.dtype == object:
+        return pd.StringDtype("pyarrow")
+    return None
+
+
+def _target_dtype(series, integers, floats, strings, max_category_ratio):
+    if integers and pd.api.types.is_integer_dtype(series.dtype):
+        return _integer_target(series)
+    if floats and series.dtype.name in _FLOAT_TARGETS:
+        return _FLOAT_TARGETS[series.dtype.name]
+    return _string_target(series, strings, max_category_ratio)
+
+
+def _unchanged(before: pd.Series, after: pd.Series) -> bool:
+    try:
+        return before.equals(after.astype(before.dtype))
+    except (TypeError, ValueError):
+        return False
+
+
+def optimize_dtypes(
+    frame: pd.DataFrame,
+    integers: bool = True,
+    floats: bool = True,
+    strings: str = "category",
+    max_category_ratio: float = 0.5,
+    exclude: list = None,
+):
+    """Converts columns to the smallest dtypes that represent their values exactly.
+
+    Integer columns are narrowed to the smallest integer dtype of the
+    same kind, signed, unsigned or nullable, that holds their range.
+    Float columns are stored as float32 if all values survive the
+    round trip. String columns are converted to category if they have
+    few distinct values, or to Arrow backed strings. A conversion is
+    only kept if converting the result back to the original dtype
+    reproduces the original values and it uses less memory, so values
+    never change.
+
+    Args:
+        frame (pd.DataFrame): Data with unique column names.
+        integers (bool, optional): Narrow integer columns.
+        floats (bool, optional): Store exactly representable float64
+            columns as float32.
+        strings (str, optional): "category" for string columns with at most
+            max_category_ratio distinct values per row, "arrow" for Arrow
+            backed strings of object columns or None to keep strings.
+        max_category_ratio (float, optional): See strings.
+        exclude (list, optional): Columns to keep as they are.
+
+    Returns:
+        The optimised frame and a report with one row per converted
+        column and the columns in REPORT_COLUMNS.
+
+    Raises:
+        ValueError: For an unknown strings option or duplicate column names.
+    """
+    if strings not in STRING_TARGETS:
+        raise ValueError(f"strings must be one of {STRING_TARGETS}, not {strings!r}")
+    if not frame.columns.is_unique:
+        raise ValueError("Dtypes can only be optimised for frames with unique column names")
+    exclude = set(exclude or ())
+    converted, rows = {}, {}
+    for column, series in frame.items():
+        if column in exclude:
+            continue
+        target = _target_dtype(series, integers, floats, strings, max_category_ratio)
+        if target is None:
+            continue
+        candidate = series.astype(target)
+        bytes_before = series.memory_usage(index=False, deep=True)
+        bytes_after = candidate.memory_usage(index=False, deep=True)
+        if bytes_after >= bytes_before or not _unchanged(series, candidate):
+            continue
+        converted[column] = candidate
+        rows[column] = [
+            str(series.dtype),
+            str(candidate.dtype),
+            bytes_before,
+            bytes_after,
+            bytes_before - bytes_after,
+        ]
+
+    report = pd.DataFrame.from_dict(rows, orient="index", columns=REPORT_COLUMNS)
+    report.index.rename("column", inplace=True)
+    if all(isinstance(column, str) for column in converted):
+        return frame.assign(**converted), report
+    optimized = frame.copy()
+    for column, values in converted.items():
+        optimized[column] = values
+    return optimized, report
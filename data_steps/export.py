@@ -1,6 +1,8 @@
 import inspect
 import re
 
+from data_steps.library import LIBRARY_STEPS
+
 
 class DataStepsStringExport:
     def __init__(self, step_collection, export_name=None, without_data_steps=False):
@@ -13,7 +15,7 @@ class DataStepsStringExport:
         lines = code.split("\n")
         definition_index = 0
         for line in lines:
-            if line.strip().startswith("def"):
+            if line.strip().startswith(("def", "async def")):
                 break
             definition_index += 1
         return "\n".join(code.split("\n")[definition_index:])
@@ -21,18 +23,44 @@ class DataStepsStringExport:
     @staticmethod
     def _step_to_pipe(step):
         if step.has_secondary_result:
-            function = f"lambda x: {step.name}(x)[0]"
-        else:
-            function = step.name
+            # The lambda does not accept keyword arguments, so they are passed inside
+            if len(step.function_kwargs) == 0:
+                return f".pipe(lambda x: {step.name}(x)[0])"
+            return f".pipe(lambda x: {step.name}(x, **{step.function_kwargs})[0])"
 
         if len(step.function_kwargs) == 0:
-            return f".pipe({function})"
-        return f".pipe({function},**{step.function_kwargs})"
+            return f".pipe({step.name})"
+        return f".pipe({step.name},**{step.function_kwargs})"
+
+    @staticmethod
+    def _step_to_statement(step):
+        call = f"{step.name}(data)"
+        if len(step.function_kwargs) > 0:
+            call = f"{step.name}(data, **{step.function_kwargs})"
+        if inspect.iscoroutinefunction(step.function):
+            call = f"(await {call})"
+        if step.has_secondary_result:
+            call = f"{call}[0]"
+        return f"data = {call}"
+
+    def _create_async_transformation_function(self):
+        # Coroutine steps cannot be piped, so they are awaited one after another
+        statements = "\n".join(
+            f"    {self._step_to_statement(step)}" for step in self._steps if not step.observe_only
+        )
+        return (
+            f"async def {self._name}(input_data):\n"
+            "    data = input_data\n"
+            f"{statements}\n"
+            "    return data\n"
+        )
 
     def _create_transformation_function(self):
+        if any(inspect.iscoroutinefunction(step.function) for step in self._steps):
+            return self._create_async_transformation_function()
         TAB_SPACES = 4
         pipes = 2 * TAB_SPACES * " " + ("\n" + 2 * TAB_SPACES * " ").join(
-            [self._step_to_pipe(step) for step in self._steps]
+            [self._step_to_pipe(step) for step in self._steps if not step.observe_only]
         )
 
         function_template = (
@@ -50,9 +78,19 @@ class DataStepsStringExport:
             return self._name
         return self._name_raw
 
+    @property
+    def _user_steps(self):
+        return [step for step in self._steps if step.function not in LIBRARY_STEPS]
+
+    @property
+    def _library_steps(self):
+        return [step for step in self._steps if step.function in LIBRARY_STEPS]
+
     @property
     def _name_raw(self):
-        first_step = inspect.getsource(list(self._steps)[0].function)
+        if len(self._user_steps) == 0:
+            raise RuntimeError("Could not determine data steps name")
+        first_step = inspect.getsource(self._user_steps[0].function)
         matches = re.match(r"^\s*@(?P<name>[^.]*)\..*", first_step)
         if matches is None:
             raise RuntimeError("Could not determine data steps name")
@@ -69,8 +107,13 @@ class DataStepsStringExport:
 
     @property
     def _independent_function_export(self):
+        imports = [
+            f"from {LIBRARY_STEPS[step.function].module} import {step.name}\n"
+            for step in self._library_steps
+        ]
         return "\n".join(
-            [
+            imports
+            + [
                 self._remove_decorator(function_def)
                 for function_def in self._function_definition_strings
             ]
@@ -78,7 +121,10 @@ class DataStepsStringExport:
 
     @property
     def _function_definition_strings(self):
-        return [self._remove_indentation(inspect.getsource(step.function)) for step in self._steps]
+        return [
+            self._remove_indentation(inspect.getsource(step.function))
+            for step in self._user_steps
+        ]
 
     @staticmethod
     def _remove_indentation(code_block):
@@ -99,11 +145,21 @@ class DataStepsStringExport:
         return "\n".join(
             [
                 f'{self.data_steps_name}.update_step_kwargs("{step.name}",{step.function_kwargs})'
-                for step in self._steps
+                for step in self._user_steps
                 if len(step.function_kwargs) > 0
             ]
         )
 
+    @property
+    def _library_registrations(self):
+        registrations = []
+        for step in self._library_steps:
+            priority = "" if step.after_first else f"priority={step.priority}, "
+            registrations.append(
+                f"{self.data_steps_name}.{step.name}({priority}**{step.function_kwargs})"
+            )
+        return "\n".join(registrations)
+
     @property
     def data_steps_export(self):
         return (
@@ -112,6 +168,8 @@ class DataStepsStringExport:
             + self._data_steps_function_export
             + "\n"
             + self._kwargs_settings
+            + "\n"
+            + self._library_registrations
         )
 
     @property
@@ -0,0 +1,166 @@
+import hashlib
+import inspect
+import pickle
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_BLOCKS = 8
+_IMMUTABLE_TYPES = (bool, int, float, complex, str, bytes, range, type(None))
+
+
+def data_fingerprint(data) -> str:
+    """Hex digest identifying the content of data.
+
+    Frames and series are hashed with pandas' vectorised row hashing
+    together with their schema. Other objects or frames with unhashable
+    values are pickled instead.
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        frame = data.to_frame() if isinstance(data, pd.Series) else data
+        columns = list(frame.columns)
+        dtypes = [str(dtype) for dtype in frame.dtypes]
+        digest.update(repr((data.shape, columns, dtypes)).encode())
+        try:
+            row_hashes = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        except TypeError:
+            digest.update(pickle.dumps(data))
+        else:
+            digest.update(row_hashes.tobytes())
+    else:
+        digest.update(pickle.dumps(data))
+    return digest.hexdigest()
+
+
+def content_fingerprint(data, sample_rows: int = None) -> str:
+    """Hex digest identifying data, optionally from a sample of its rows.
+
+    With sample_rows only that many rows, taken in blocks spread evenly
+    over the frame, are hashed together with the shape of the whole
+    frame. This is faster for large frames, but frames differing only
+    in rows outside of the sample get the same fingerprint.
+    """
+    if sample_rows is None or not isinstance(data, pd.DataFrame) or len(data) <= sample_rows:
+        return data_fingerprint(data)
+    block_size = max(sample_rows // SAMPLE_BLOCKS, 1)
+    starts = np.unique(np.linspace(0, len(data) - block_size, SAMPLE_BLOCKS).astype(int))
+    rows = (starts[:, None] + np.arange(block_size)).ravel()
+    digest = hashlib.sha256()
+    digest.update(repr(data.shape).encode())
+    digest.update(data_fingerprint(data.iloc[rows]).encode())
+    return digest.hexdigest()
+
+
+def _array_fingerprint(array: np.ndarray) -> str:
+    digest = hashlib.sha256(repr((array.dtype.str, array.shape)).encode())
+    if array.dtype.hasobject:
+        digest.update(pickle.dumps(array))
+    else:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _value_fingerprint(value) -> str:
+    # The repr of arrays and frames is truncated, so their content is hashed
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return data_fingerprint(value)
+    if isinstance(value, pd.Index):
+        return data_fingerprint(value.to_series(index=range(len(value))))
+    if isinstance(value, np.ndarray):
+        return _array_fingerprint(value)
+    if isinstance(value, (list, tuple)):
+        return repr((type(value).__name__, [_value_fingerprint(item) for item in value]))
+    if isinstance(value, dict):
+        return repr(
+            [(_value_fingerprint(key), _value_fingerprint(item)) for key, item in value.items()]
+        )
+    return repr(value)
+
+
+@lru_cache(maxsize=1024)
+def _global_names(code) -> tuple:
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        # Lambdas and comprehensions within the step have their own code objects
+        if inspect.iscode(constant):
+            names.update(_global_names(constant))
+    return tuple(sorted(names))
+
+
+def _is_immutable(value) -> bool:
+    if isinstance(value, (tuple, frozenset)):
+        return all(_is_immutable(item) for item in value)
+    return isinstance(value, _IMMUTABLE_TYPES)
+
+
+def _global_fingerprints(function) -> list:
+    """Fingerprints of the global variables with immutable values a function reads.
+
+    Only constants like numbers, strings and tuples of them are covered.
+    Mutable values like dicts, lists, arrays or frames are skipped, as
+    steps may modify them, e.g. counters, which would invalidate
+    checkpoints and cache entries written by the same run. Globals read
+    by functions the step calls are not covered either.
+    """
+    namespace = getattr(function, "__globals__", {})
+    return [
+        (name, repr(namespace[name]))
+        for name in _global_names(function.__code__)
+        if name in namespace and _is_immutable(namespace[name])
+    ]
+
+
+def globals_fingerprint(steps) -> str:
+    """Hex digest of the global constants read by steps, see _global_fingerprints.
+
+    It is part of the step fingerprints, but cheaper to compute, so it
+    can be used to check whether memoised fingerprints are still valid.
+    """
+    fingerprints = [_global_fingerprints(step.function) for step in steps]
+    return hashlib.sha256(repr(fingerprints).encode()).hexdigest()
+
+
+def step_fingerprint(step) -> str:
+    """Hex digest of the code, keyword arguments and options of a step.
+
+    The code is identified by its source and the values of variables
+    from enclosing scopes and of global constants it reads, see
+    _global_fingerprints. If the source is not available, e.g. for
+    functions defined in an interactive interpreter, the compiled
+    bytecode and constants are used. Options changing the results, i.e.
+    has_secondary_result, observe_only and the declared columns, are
+    included as well.
+    """
+    try:
+        code = inspect.getsource(step.function)
+    except (OSError, TypeError):
+        function_code = step.function.__code__
+        code = repr((function_code.co_code, function_code.co_consts))
+    closure = [_value_fingerprint(cell.cell_contents) for cell in step.function.__closure__ or []]
+    kwargs = sorted(
+        (name, _value_fingerprint(value)) for name, value in step.function_kwargs.items()
+    )
+    options = (step.has_secondary_result, step.observe_only, step.reads, step.writes)
+    digest = hashlib.sha256()
+    digest.update(
+        repr(
+            (step.name, code, closure, _global_fingerprints(step.function), kwargs, options)
+        ).encode()
+    )
+    return digest.hexdigest()
+
+
+def prefix_fingerprints(steps) -> list:
+    """Fingerprints of all prefixes of steps.
+
+    The nth fingerprint covers steps[: n + 1], such that changing a step
+    changes the fingerprints of all steps after it.
+    """
+    fingerprints = []
+    digest = hashlib.sha256()
+    for step in steps:
+        digest.update(step_fingerprint(step).encode())
+        fingerprints.append(digest.copy().hexdigest())
+    return fingerprints
@@ -0,0 +1,162 @@
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from data_steps.fingerprint import step_fingerprint
+from data_steps.hooks import Hooks, current_call
+
+REPORT_COLUMNS = [
+    "function_name",
+    "wall_time",
+    "rows_in",
+    "time_per_row",
+    "baseline_time_per_row",
+    "ratio",
+    "regression",
+    "fingerprint_changed",
+    "likely_cause",
+]
+
+
+class RunHistory(Hooks):
+    """Hooks appending the step timings of every pipeline run to a JSON lines file.
+
+    Each line holds one run with its start time, duration, error and
+    for each applied step in order its name, wall time, input shape
+    and a fingerprint of its code and keyword arguments. Steps are
+    attributed to the pipeline call applying them, see current_call,
+    so concurrent runs of the same instance are recorded separately.
+    Runs applying only some of the steps, e.g. partial_transform, and
+    profiled runs, whose times are inflated by the measurements, are
+    not recorded.
+
+    Args:
+        path (str or Path): JSON lines file, which is created if needed.
+    """
+
+    MAX_CACHED_FINGERPRINTS = 1000
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._active = {}
+        self._fingerprints = {}
+
+    def _fingerprint(self, step) -> str:
+        # Steps are not modified once registered, so their fingerprints can be kept
+        cached = self._fingerprints.get(id(step))
+        if cached is not None and cached[0] is step:
+            return cached[1]
+        if len(self._fingerprints) > self.MAX_CACHED_FINGERPRINTS:
+            self._fingerprints.clear()
+        fingerprint = step_fingerprint(step)[:16]
+        self._fingerprints[id(step)] = (step, fingerprint)
+        return fingerprint
+
+    def on_pipeline_start(self, pipeline):
+        with self._lock:
+            self._active[current_call()] = {
+                "started": datetime.now(timezone.utc).isoformat(),
+                "steps": [],
+            }
+
+    def on_step_end(self, pipeline, step, event):
+        fingerprint = self._fingerprint(step)
+        with self._lock:
+            record = self._active.get(current_call())
+            if record is None:
+                return
+            record["steps"].append(
+                {
+                    "function_name": event.step_name,
+                    "fingerprint": fingerprint,
+                    "wall_time": event.duration,
+                    "rows_in": event.rows_in,
+                    "columns_in": event.columns_in,
+                }
+            )
+
+    def on_pipeline_end(self, pipeline, event):
+        with self._lock:
+            record = self._active.pop(current_call(), None)
+            if record is None or event.partial or event.profiled:
+                return
+            record["duration"] = event.duration
+            record["error"] = None if event.exception is None else repr(event.exception)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def runs(self) -> list:
+        """All recorded runs, oldest first."""
+        if not self.path.exists():
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def performance_report(runs: list, threshold: float = 1.5, window: int = 20) -> pd.DataFrame:
+    """Compares the step timings of the last successful run with earlier runs.
+
+    Timings are normalised by the number of input rows of the step.
+    The baseline of a step is the median time per row over the previous
+    successful runs in the window. A step is a regression if its time
+    per row exceeds the baseline by more than the threshold factor.
+    The likely cause of a regression is the step itself if its
+    fingerprint changed since the previous run, otherwise the closest
+    step before it whose fingerprint changed.
+
+    Args:
+        runs (list): Runs as recorded by RunHistory, oldest first.
+        threshold (float, optional): Factor of the baseline above which a
+            step is reported as regression.
+        window (int, optional): Number of previous runs forming the baseline.
+
+    Returns:
+        One row per step of the last run with the columns in REPORT_COLUMNS.
+    """
+    runs = [run for run in runs if run.get("error") is None and run["steps"]]
+    if not runs:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    latest, previous = runs[-1], runs[-window - 1 : -1]
+
+    def time_per_row(step_record):
+        return step_record["wall_time"] / max(step_record["rows_in"] or 0, 1)
+
+    baselines, last_fingerprints = {}, {}
+    for run in previous:
+        for step_record in run["steps"]:
+            name = step_record["function_name"]
+            baselines.setdefault(name, []).append(time_per_row(step_record))
+            last_fingerprints[name] = step_record["fingerprint"]
+
+    rows, changed = [], None
+    for step_record in latest["steps"]:
+        name = step_record["function_name"]
+        fingerprint_changed = last_fingerprints.get(name, step_record["fingerprint"]) != (
+            step_record["fingerprint"]
+        )
+        if fingerprint_changed:
+            changed = name
+        baseline = pd.Series(baselines.get(name, []), dtype=float).median()
+        ratio = time_per_row(step_record) / baseline if baseline > 0 else float("nan")
+        regression = bool(ratio > threshold)
+        rows.append(
+            {
+                "function_name": name,
+                "wall_time": step_record["wall_time"],
+                "rows_in": step_record["rows_in"],
+                "time_per_row": time_per_row(step_record),
+                "baseline_time_per_row": baseline,
+                "ratio": ratio,
+                "regression": regression,
+                "fingerprint_changed": fingerprint_changed,
+                "likely_cause": changed if regression else None,
+            }
+        )
+    report = pd.DataFrame(rows, columns=REPORT_COLUMNS)
+    report.index.rename("application_order", inplace=True)
+    return report
@@ -0,0 +1,251 @@
+import contextvars
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+
+from data_steps.profiling import _shape
+
+_registered_hooks = ()
+_current_call = contextvars.ContextVar("data_steps_pipeline_call", default=None)
+
+
+@dataclass
+class StepEvent:
+    """Outcome of the execution of a step.
+
+    Attributes:
+        step_name: Name of the step.
+        duration: Wall time in seconds.
+        rows_in, columns_in: Shape of the input.
+        rows_out, columns_out: Shape of the primary output, None if
+            the step raised an exception.
+        exception: Exception raised by the step or None.
+    """
+
+    step_name: str
+    duration: float
+    rows_in: int
+    columns_in: int
+    rows_out: int = None
+    columns_out: int = None
+    exception: BaseException = None
+
+
+@dataclass
+class PipelineEvent:
+    """Outcome of applying the steps of a pipeline once.
+
+    Attributes:
+        duration: Wall time in seconds.
+        exception: Exception raised while applying the steps or None.
+        partial: Whether only some of the leading steps were applied.
+        profiled: Whether the steps were measured while being applied,
+            which inflates their times.
+    """
+
+    duration: float
+    exception: BaseException = None
+    partial: bool = False
+    profiled: bool = False
+
+
+class Hooks:
+    """Base class of instrumentation hooks.
+
+    Subclasses override the methods of the events they are interested
+    in. Hooks are called in the thread executing the pipeline or the
+    step, which can differ for concurrently executed steps, and must not
+    modify the data. Exceptions raised by hooks propagate to the caller.
+    """
+
+    def on_pipeline_start(self, pipeline):
+        """Called before the steps of pipeline are applied."""
+
+    def on_step_start(self, pipeline, step):
+        """Called before step is applied."""
+
+    def on_step_end(self, pipeline, step, event: StepEvent):
+        """Called after step was applied or raised an exception."""
+
+    def on_pipeline_end(self, pipeline, event: PipelineEvent):
+        """Called after the steps of pipeline were applied or one raised an exception."""
+
+
+def register_hooks(hooks: Hooks):
+    """Registers hooks for all DataSteps instances."""
+    global _registered_hooks
+    _registered_hooks = (*_registered_hooks, hooks)
+
+
+def unregister_hooks(hooks: Hooks):
+    """Removes globally registered hooks."""
+    global _registered_hooks
+    _registered_hooks = tuple(
+        registered for registered in _registered_hooks if registered is not hooks
+    )
+
+
+def current_call():
+    """PipelineCall applying steps in the current context, or None.
+
+    Hooks can use it to tell apart concurrent calls of the same
+    pipeline. Steps executed in other threads for a call, e.g.
+    concurrently scheduled or observe only steps, see the call
+    they belong to.
+    """
+    return _current_call.get()
+
+
+def active_hooks(instance_hooks: tuple) -> tuple:
+    """Globally registered hooks followed by the hooks of an instance."""
+    if not _registered_hooks:
+        return instance_hooks
+    return (*_registered_hooks, *instance_hooks)
+
+
+class StepCall:
+    """Context of a step execution that notifies hooks.
+
+    The caller assigns the result of the step to the result attribute.
+    """
+
+    def __init__(self, hooks: tuple, pipeline, step, data):
+        self._hooks = hooks
+        self._pipeline = pipeline
+        self._step = step
+        self._shape_in = _shape(data)
+        self.result = None
+
+    def __enter__(self):
+        for hooks in self._hooks:
+            hooks.on_step_start(self._pipeline, self._step)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exception, traceback):
+        duration = time.perf_counter() - self._start
+        rows_out, columns_out = (None, None) if exception else _shape(self.result[0])
+        event = StepEvent(
+            self._step.name, duration, *self._shape_in, rows_out, columns_out, exception
+        )
+        for hooks in self._hooks:
+            hooks.on_step_end(self._pipeline, self._step, event)
+        return False
+
+
+class PipelineCall:
+    """Context of applying the steps of a pipeline that notifies hooks.
+
+    partial and profiled are passed on to the PipelineEvent. While
+    the steps are applied the call is the current_call.
+    """
+
+    def __init__(self, hooks: tuple, pipeline, partial: bool = False, profiled: bool = False):
+        self._hooks = hooks
+        self._pipeline = pipeline
+        self._partial = partial
+        self._profiled = profiled
+
+    def __enter__(self):
+        self._token = _current_call.set(self)
+        for hooks in self._hooks:
+            hooks.on_pipeline_start(self._pipeline)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exception, traceback):
+        event = PipelineEvent(
+            time.perf_counter() - self._start, exception, self._partial, self._profiled
+        )
+        try:
+            for hooks in self._hooks:
+                hooks.on_pipeline_end(self._pipeline, event)
+        finally:
+            _current_call.reset(self._token)
+        return False
+
+
+class HistogramCollector(Hooks):
+    """Hooks aggregating step durations into histograms per step name.
+
+    Durations are counted in buckets whose upper bounds are powers of
+    two times the resolution, such that recording a step only costs
+    a logarithm and a few additions. Quantiles are estimated as the
+    upper bound of the bucket containing them.
+
+    Args:
+        resolution (float, optional): Upper bound of the first bucket
+            in seconds. Defaults to one microsecond.
+    """
+
+    QUANTILES = [0.5, 0.9, 0.99]
+
+    def __init__(self, resolution: float = 1e-6):
+        self.resolution = resolution
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discards all recorded durations."""
+        with self._lock:
+            self._steps = {}
+
+    def on_step_end(self, pipeline, step, event: StepEvent):
+        bucket = max(math.ceil(math.log2(max(event.duration, 1e-12) / self.resolution)), 0)
+        with self._lock:
+            record = self._steps.setdefault(
+                event.step_name,
+                {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "rows_in": 0, "buckets": {}},
+            )
+            record["count"] += 1
+            record["errors"] += event.exception is not None
+            record["total"] += event.duration
+            record["max"] = max(record["max"], event.duration)
+            record["rows_in"] += event.rows_in or 0
+            record["buckets"][bucket] = record["buckets"].get(bucket, 0) + 1
+
+    def histogram(self, step_name: str) -> pd.Series:
+        """Number of executions of a step by upper bucket bound in seconds."""
+        with self._lock:
+            buckets = dict(self._steps.get(step_name, {}).get("buckets", {}))
+        return pd.Series(
+            {self.resolution * 2**bucket: count for bucket, count in sorted(buckets.items())},
+            dtype=int,
+        ).rename_axis("duration_upper_bound")
+
+    def _quantile(self, buckets: dict, count: int, quantile: float) -> float:
+        seen = 0
+        for bucket, bucket_count in sorted(buckets.items()):
+            seen += bucket_count
+            if seen >= quantile * count:
+                return self.resolution * 2**bucket
+        return math.nan
+
+    def summary(self) -> pd.DataFrame:
+        """Count, errors, total and mean duration, quantiles and maximum per step name."""
+        with self._lock:
+            records = {
+                name: {**record, "buckets": dict(record["buckets"])}
+                for name, record in self._steps.items()
+            }
+        rows = {
+            name: {
+                "count": record["count"],
+                "errors": record["errors"],
+                "total_time": record["total"],
+                "mean_time": record["total"] / record["count"],
+                **{
+                    f"p{round(quantile * 100)}_time": self._quantile(
+                        record["buckets"], record["count"], quantile
+                    )
+                    for quantile in self.QUANTILES
+                },
+                "max_time": record["max"],
+                "rows_in": record["rows_in"],
+            }
+            for name, record in records.items()
+        }
+        return pd.DataFrame.from_dict(rows, orient="index").rename_axis("function_name")
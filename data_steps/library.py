@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import Callable
+
+from data_steps.dtypes import optimize_dtypes
+
+
+@dataclass(frozen=True)
+class LibraryStep:
+    """Step function shipped with data_steps.
+
+    Library steps are registered with the DataSteps method of the same
+    name, imported instead of exported with their source and not linted,
+    as they are written with their dtypes and copies in mind.
+
+    Attributes:
+        module: Module the function is imported from.
+        metadata: Function of the secondary result of the step returning
+            further columns of the step metadata of runs, or None.
+    """
+
+    module: str
+    metadata: Callable = None
+
+
+def _dtypes_metadata(report) -> dict:
+    return {"bytes_saved": int(report["bytes_saved"].sum())}
+
+
+LIBRARY_STEPS = {optimize_dtypes: LibraryStep("data_steps.dtypes", _dtypes_metadata)}
@@ -0,0 +1,223 @@
+import ast
+import inspect
+import textwrap
+
+import pandas as pd
+
+from data_steps.library import LIBRARY_STEPS
+
+RULES = {
+    "apply_axis_1": "row wise .apply(..., axis=1), use vectorised column operations",
+    "row_iteration": "loop over .iterrows() or .itertuples(), use vectorised operations",
+    "concat_in_loop": "pd.concat inside a loop, collect the parts and concatenate once",
+    "chained_assignment": "chained indexing assignment, assign with a single .loc[rows, columns]",
+    "object_strings": "conversion to object dtype, keep strings in a string dtype",
+    "object_string_ops": ".str methods on object dtype values, convert to a string dtype first",
+    "copy": ".copy() of a frame inside a step, with Copy-on-Write derived frames copy only when "
+    "modified",
+}
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While, ast.ListComp, ast.GeneratorExp, ast.DictComp)
+_INDEXERS = {"loc", "iloc", "at", "iat"}
+# Methods of frames and series returning plain Python or NumPy objects
+_CONVERSIONS = {"tolist", "to_list", "to_dict", "to_numpy", "to_records", "keys", "items", "unique"}
+
+
+def _is_call_of(node, attribute: str) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == attribute
+    )
+
+
+def _constant_value(node):
+    if isinstance(node, ast.Constant):
+        return node.value
+    # Python 3.7 parses literals as ast.Num and ast.Str
+    if type(node).__name__ == "Num":
+        return node.n
+    if type(node).__name__ == "Str":
+        return node.s
+    return None
+
+
+def _str_is_object() -> bool:
+    # Only before pandas 3 or without the future.infer_string option astype(str) gives object
+    return pd.Series(["a"]).astype(str).dtype == object
+
+
+def _is_object_dtype(node, str_is_object: bool) -> bool:
+    names = ("object", "str") if str_is_object else ("object",)
+    if isinstance(node, ast.Name):
+        return node.id in names
+    return _constant_value(node) in (*names, "O")
+
+
+class _StepVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.findings = []
+        self._loop_depth = 0
+        self._str_is_object = _str_is_object()
+        # Names and (name, column) pairs of frames and of values converted to object dtype
+        self._frames = set()
+        self._objects = set()
+        self._in_step = False
+
+    def _add(self, rule: str, node):
+        self.findings.append((rule, node.lineno))
+
+    def generic_visit(self, node):
+        is_loop = isinstance(node, _LOOPS)
+        self._loop_depth += is_loop
+        super().generic_visit(node)
+        self._loop_depth -= is_loop
+
+    def _is_frame(self, node) -> bool:
+        if isinstance(node, ast.Name):
+            return node.id in self._frames
+        if isinstance(node, ast.Subscript):
+            return self._is_frame(node.value)
+        if isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id in ("pd", "pandas"):
+                return False
+            return node.attr != "values" and self._is_frame(node.value)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if isinstance(node.func.value, ast.Name) and node.func.value.id in ("pd", "pandas"):
+                return True
+            return node.func.attr not in _CONVERSIONS and self._is_frame(node.func.value)
+        return False
+
+    def _is_object(self, node) -> bool:
+        if _is_call_of(node, "astype") and node.args:
+            return _is_object_dtype(node.args[0], self._str_is_object)
+        if isinstance(node, ast.Name):
+            return node.id in self._objects
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+            return (node.value.id, _constant_value(_subscript_index(node))) in self._objects
+        return False
+
+    def _bind(self, target, value):
+        key = target.id if isinstance(target, ast.Name) else None
+        if isinstance(target, ast.Subscript) and isinstance(target.value, ast.Name):
+            key = (target.value.id, _constant_value(_subscript_index(target)))
+        if key is None:
+            return
+        if isinstance(target, ast.Name) and self._is_frame(value):
+            self._frames.add(key)
+        else:
+            self._frames.discard(key)
+        if self._is_object(value):
+            self._objects.add(key)
+        else:
+            self._objects.discard(key)
+
+    def _visit_function(self, node):
+        if not self._in_step:
+            # Positional parameters of the step, the first of which is the frame
+            self._frames.update(arg.arg for arg in node.args.args)
+        self._in_step = True
+        self.generic_visit(node)
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_function
+
+    def visit_Call(self, node):
+        if _is_call_of(node, "apply") and any(
+            keyword.arg == "axis" and _constant_value(keyword.value) in (1, "columns")
+            for keyword in node.keywords
+        ):
+            self._add("apply_axis_1", node)
+        if _is_call_of(node, "iterrows") or _is_call_of(node, "itertuples"):
+            self._add("row_iteration", node)
+        is_concat = _is_call_of(node, "concat") or (
+            isinstance(node.func, ast.Name) and node.func.id == "concat"
+        )
+        if is_concat and self._loop_depth > 0:
+            self._add("concat_in_loop", node)
+        if _is_call_of(node, "astype") and self._is_object(node):
+            self._add("object_strings", node)
+        if any(
+            keyword.arg == "dtype" and _is_object_dtype(keyword.value, self._str_is_object)
+            for keyword in node.keywords
+        ):
+            self._add("object_strings", node)
+        accessor = node.func.value if isinstance(node.func, ast.Attribute) else None
+        if (
+            isinstance(accessor, ast.Attribute)
+            and accessor.attr == "str"
+            and self._is_object(accessor.value)
+        ):
+            self._add("object_string_ops", node)
+        if _is_call_of(node, "copy") and (
+            any(keyword.arg == "deep" for keyword in node.keywords)
+            or self._is_frame(node.func.value)
+        ):
+            self._add("copy", node)
+        self.generic_visit(node)
+
+    def _check_target(self, target):
+        if not isinstance(target, ast.Subscript):
+            return
+        indexed = target.value
+        if isinstance(indexed, ast.Attribute) and indexed.attr in _INDEXERS:
+            indexed = indexed.value
+        if isinstance(indexed, ast.Subscript) or (
+            isinstance(indexed, ast.Attribute) and isinstance(indexed.value, ast.Subscript)
+        ):
+            self._add("chained_assignment", target)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self._check_target(target)
+        self.generic_visit(node)
+        for target in node.targets:
+            self._bind(target, node.value)
+
+    def visit_AugAssign(self, node):
+        self._check_target(node.target)
+        self.generic_visit(node)
+
+
+def _subscript_index(node):
+    # Before Python 3.9 the index of a subscript is wrapped in ast.Index
+    return node.slice.value if type(node.slice).__name__ == "Index" else node.slice
+
+
+def lint_function(function) -> list:
+    """Performance anti-patterns in the source of a function.
+
+    Returns:
+        List of (rule, line number in the source file) pairs, or None if
+        the source is not available.
+    """
+    try:
+        lines, first_line = inspect.getsourcelines(function)
+    except (OSError, TypeError):
+        return None
+    visitor = _StepVisitor()
+    visitor.visit(ast.parse(textwrap.dedent("".join(lines))))
+    return [(rule, first_line + line - 1) for rule, line in visitor.findings]
+
+
+def lint_steps(steps) -> pd.DataFrame:
+    """Performance anti-patterns of steps, one row per step in application order.
+
+    Columns are the function name, the number of findings per rule in
+    RULES and a list of messages with line numbers. Counts are missing
+    for steps whose source is not available.
+    """
+    rows = []
+    for step in steps:
+        findings = [] if step.function in LIBRARY_STEPS else lint_function(step.function)
+        row = {"function_name": step.name}
+        for rule in RULES:
+            row[rule] = None if findings is None else sum(found == rule for found, _ in findings)
+        row["messages"] = (
+            ["source not available"]
+            if findings is None
+            else [f"line {line}: {RULES[rule]}" for rule, line in findings]
+        )
+        rows.append(row)
+    report = pd.DataFrame(rows, columns=["function_name", *RULES, "messages"])
+    report.index.rename("application_order", inplace=True)
+    return report
@@ -0,0 +1,189 @@
+import os
+import warnings
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from data_steps.arrow import (
+    read_shared_memory,
+    release_shared_memory,
+    require_pyarrow,
+    to_shared_memory,
+)
+
+_worker_steps = None
+_worker_function = None
+
+
+def _set_worker_steps(steps):
+    global _worker_steps
+    _worker_steps = steps
+
+
+def _apply_worker_steps(data):
+    for step in _worker_steps:
+        data, _ = step.apply(data)
+    return data
+
+
+def _set_worker_function(function):
+    global _worker_function
+    _worker_function = function
+
+
+def _call_worker_function(item):
+    return _worker_function(item)
+
+
+def _transform_shared(handle):
+    return to_shared_memory(_apply_worker_steps(read_shared_memory(handle)))
+
+
+def _collect(futures):
+    """Results of all futures, releasing the shared memory of all of them on errors."""
+    handles, error = [], None
+    for future in futures:
+        try:
+            handles.append(future.result())
+        except Exception as exception:
+            error = error or exception
+    if error is not None:
+        for handle in handles:
+            release_shared_memory(handle)
+        raise error
+    return handles
+
+
+def concat_partitions(frames: list) -> pd.DataFrame:
+    """Concatenates transformed row partitions in order.
+
+    Categorical columns whose categories differ between partitions are
+    combined with the sorted union of their categories, as astype would
+    give for the whole data. Other dtypes that differ between partitions,
+    which depend on the values in each partition, are warned about.
+    """
+    result = pd.concat(frames)
+    differing = []
+    for column in frames[0].columns:
+        values = [frame[column] for frame in frames if column in frame]
+        if len(values) == len(frames) and all(series.dtype == values[0].dtype for series in values):
+            continue
+        categorical = all(isinstance(series.dtype, pd.CategoricalDtype) for series in values)
+        if categorical and len(values) == len(frames):
+            try:
+                union = pd.api.types.union_categoricals(values, sort_categories=True)
+            except TypeError:
+                pass
+            else:
+                result[column] = pd.Categorical(union)
+                continue
+        differing.append(str(column))
+    if differing:
+        warnings.warn(
+            "Transformed partitions have different dtypes in the columns "
+            f"{', '.join(differing)}, the result can differ from transforming all rows at once.",
+            stacklevel=4,
+        )
+    return result
+
+
+def transform_partitions(data: pd.DataFrame, steps, workers: int = None, partitions: int = None):
+    """Applies steps to row partitions of data in a pool of processes.
+
+    Partitions and their results are exchanged through shared memory
+    as Arrow IPC streams, the steps are sent to each worker once.
+    The transformed partitions are concatenated in their original order,
+    see concat_partitions.
+
+    Args:
+        data (pd.DataFrame): Data to transform.
+        steps (list): Row local steps without secondary results.
+        workers (int, optional): Number of processes. Defaults to the
+            number of CPUs.
+        partitions (int, optional): Number of partitions. Defaults to
+            the number of workers.
+
+    Raises:
+        ArrowRoundTripError: If partitions or their results would change
+            by the exchange through Arrow, see restores_frame.
+    """
+    require_pyarrow("Parallel transformations")
+    workers = workers or os.cpu_count()
+    partitions = max(min(partitions or workers, len(data)), 1)
+    bounds = [len(data) * n // partitions for n in range(partitions + 1)]
+
+    handles = []
+    try:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            handles.append(to_shared_memory(data.iloc[start:stop]))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_set_worker_steps, initargs=(list(steps),)
+        ) as executor:
+            result_handles = _collect([executor.submit(_transform_shared, h) for h in handles])
+    finally:
+        for handle in handles:
+            release_shared_memory(handle)
+
+    try:
+        return concat_partitions([read_shared_memory(handle) for handle in result_handles])
+    finally:
+        for handle in result_handles:
+            release_shared_memory(handle)
+
+
+def process_map(function, items, workers: int = None, ordered: bool = True, max_in_flight=None):
+    """Lazily applies function to items in a pool of processes.
+
+    The function is sent to each worker once, items are submitted
+    one by one as results are consumed. Pending items are cancelled
+    if the generator is closed early or an item fails.
+
+    Args:
+        function (callable): Picklable function of one item.
+        items (iterable): Picklable items.
+        workers (int, optional): Number of processes. Defaults to the
+            number of CPUs.
+        ordered (bool, optional): If True results are yielded in the
+            order of the items, otherwise in the order of completion.
+        max_in_flight (int, optional): Maximal number of submitted items
+            whose results have not been yielded. Defaults to twice the
+            number of workers.
+
+    Returns:
+        A generator of pairs of the position of an item and its result.
+    """
+    workers = workers or os.cpu_count()
+    max_in_flight = max(max_in_flight or 2 * workers, 1)
+    items = enumerate(items)
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_set_worker_function, initargs=(function,)
+    )
+    pending = {}
+    queue = deque()
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    n, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(_call_worker_function, item)
+                pending[future] = n
+                if ordered:
+                    queue.append(future)
+            if not pending:
+                return
+            if ordered:
+                future = queue.popleft()
+            else:
+                future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+            n = pending.pop(future)
+            yield n, future.result()
+    finally:
+        # Cancelled explicitly, shutdown only supports cancel_futures from Python 3.9
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
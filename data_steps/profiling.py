@@ -0,0 +1,168 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMNS = ["wall_time", "cpu_time"]
+SHAPE_COLUMNS = ["rows_in", "columns_in", "rows_out", "columns_out"]
+MEMORY_COLUMNS = ["bytes_in", "bytes_out", "bytes_delta", "peak_bytes", "largest_column_growth"]
+PREVIEW_COLUMNS = [
+    "sample_rows_in",
+    "sample_wall_time",
+    "scaling_exponent",
+    "extrapolated_wall_time",
+]
+SUPERLINEAR_EXPONENT = 1.2
+_MIN_TIME = 1e-9
+
+
+def _shape(data):
+    shape = tuple(getattr(data, "shape", ()))
+    rows = shape[0] if len(shape) > 0 else None
+    columns = shape[1] if len(shape) > 1 else None
+    return rows, columns
+
+
+def measure(apply, step, data):
+    """Applies a step and measures its cost.
+
+    Args:
+        apply (callable): Function applying step to data.
+        step (Step): Step to apply.
+        data: Input of the step.
+
+    Returns:
+        The result of apply and a dict with the wall and cpu time in
+        seconds as well as the number of rows and columns of the input
+        and primary output.
+    """
+    rows_in, columns_in = _shape(data)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = apply(step, data)
+    wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    rows_out, columns_out = _shape(result[0])
+    return result, {
+        "wall_time": wall_time,
+        "cpu_time": cpu_time,
+        "rows_in": rows_in,
+        "columns_in": columns_in,
+        "rows_out": rows_out,
+        "columns_out": columns_out,
+    }
+
+
+def _column_bytes(data):
+    if isinstance(data, pd.DataFrame):
+        return data.memory_usage(deep=True, index=False)
+    if isinstance(data, pd.Series):
+        return pd.Series({data.name: data.memory_usage(deep=True, index=False)})
+    return None
+
+
+def measure_memory(apply, step, data, n_columns: int = 3):
+    """Applies a step and measures its memory usage.
+
+    The peak is measured with tracemalloc, i.e. it covers allocations
+    traced by python, which includes numpy and therefore most pandas
+    data, but not for example memory allocated by pyarrow.
+
+    Args:
+        apply (callable): Function applying step to data.
+        step (Step): Step to apply.
+        data: Input of the step.
+        n_columns (int, optional): Number of columns reported as
+            the ones that grew the most.
+
+    Returns:
+        The result of apply and a dict with the deep memory usage in bytes
+        of the input and primary output, their difference, the peak of newly
+        allocated bytes during the step and the columns that grew the most
+        mapped to their growth in bytes. Sizes are None if the data is
+        neither a frame nor a series.
+    """
+    columns_in = _column_bytes(data)
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    elif hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    try:
+        result = apply(step, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started:
+            tracemalloc.stop()
+
+    columns_out = _column_bytes(result[0])
+    if columns_in is None or columns_out is None:
+        bytes_in = bytes_out = bytes_delta = largest_column_growth = None
+    else:
+        bytes_in, bytes_out = int(columns_in.sum()), int(columns_out.sum())
+        bytes_delta = bytes_out - bytes_in
+        growth = columns_out.sub(columns_in, fill_value=0).nlargest(n_columns)
+        largest_column_growth = {
+            column: int(value) for column, value in growth.items() if value > 0
+        }
+    return result, {
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "bytes_delta": bytes_delta,
+        "peak_bytes": max(peak - baseline, 0),
+        "largest_column_growth": largest_column_growth,
+    }
+
+
+def fit_scaling(sizes, times):
+    """Fits times = coefficient * sizes ** exponent in log-log space.
+
+    If less than two distinct positive sizes are given the times are
+    assumed to scale linearly.
+
+    Returns:
+        The exponent and the coefficient.
+    """
+    sizes = np.asarray(sizes, dtype=float)
+    times = np.maximum(np.asarray(times, dtype=float), _MIN_TIME)
+    positive = sizes > 0
+    if len(np.unique(sizes[positive])) < 2:
+        if not positive.any():
+            return 0.0, float(times.mean())
+        return 1.0, float((times[positive] / sizes[positive]).mean())
+    exponent, intercept = np.polyfit(np.log(sizes[positive]), np.log(times[positive]), 1)
+    return float(exponent), float(np.exp(intercept))
+
+
+class StepProfile:
+    """Measurements of profiled runs accumulated by step name.
+
+    Times and call counts are summed over all added runs, shapes
+    are those of the last run.
+    """
+
+    def __init__(self):
+        self._profile = {}
+
+    def add(self, step_metadata: pd.DataFrame):
+        """Adds the measured steps of the metadata of a profiled run."""
+        if "wall_time" not in step_metadata:
+            return
+        for _, record in step_metadata.dropna(subset=["wall_time"]).iterrows():
+            profile = self._profile.setdefault(
+                record["function_name"], {"calls": 0, **{column: 0.0 for column in TIME_COLUMNS}}
+            )
+            profile["calls"] += 1
+            for column in TIME_COLUMNS:
+                profile[column] += record[column]
+            for column in SHAPE_COLUMNS:
+                profile[column] = record[column]
+
+    def overview(self, steps_overview: pd.DataFrame) -> pd.DataFrame:
+        """Steps overview with the accumulated measurements as additional columns."""
+        if steps_overview.empty:
+            return steps_overview
+        profile = pd.DataFrame.from_dict(
+            self._profile, orient="index", columns=["calls", *TIME_COLUMNS, *SHAPE_COLUMNS]
+        )
+        return steps_overview.join(profile, on="function_name")
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pandas as pd
+
+
+def read_frame(path, columns: list = None) -> pd.DataFrame:
+    """Reads a frame from a file, choosing the reader by the file suffix.
+
+    Args:
+        path (str or Path): Path of a parquet, feather, csv or pickle file.
+        columns (list, optional): If set only these columns are read.
+
+    Raises:
+        ValueError: If the suffix does not belong to a supported format.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return pd.read_parquet(path, columns=columns)
+    if suffix == ".feather":
+        return pd.read_feather(path, columns=columns)
+    if suffix == ".csv":
+        return pd.read_csv(path, usecols=columns)
+    if suffix in (".pkl", ".pickle"):
+        data = pd.read_pickle(path)
+        return data if columns is None else data.loc[:, columns]
+    raise ValueError(
+        f"Cannot read {path}, supported suffixes are .parquet, .pq, .feather, .csv, "
+        ".pkl and .pickle"
+    )
@@ -0,0 +1,107 @@
+import pandas as pd
+
+
+def declares_columns(step) -> bool:
+    """Whether a step declares the columns it reads and writes."""
+    return step.reads is not None and step.writes is not None
+
+
+def required_columns(steps) -> list:
+    """Input columns that steps read before writing them.
+
+    Args:
+        steps (list): Steps in priority order.
+
+    Raises:
+        ValueError: If a step does not declare its columns.
+    """
+    undeclared = [step.name for step in steps if not declares_columns(step)]
+    if undeclared:
+        raise ValueError(
+            "Required columns can only be determined if all steps declare the columns "
+            f"they read and write, which the steps {', '.join(undeclared)} do not."
+        )
+    required, written = [], set()
+    for step in steps:
+        required.extend(
+            column for column in step.reads if column not in written and column not in required
+        )
+        written.update(step.writes)
+    return required
+
+
+def _conflict(earlier, later) -> bool:
+    earlier_reads, earlier_writes = set(earlier.reads), set(earlier.writes)
+    later_reads, later_writes = set(later.reads), set(later.writes)
+    return bool(earlier_writes & (later_reads | later_writes) or earlier_reads & later_writes)
+
+
+def build_schedule(steps) -> list:
+    """Groups steps into levels of steps that can be executed concurrently.
+
+    Steps that do not declare the columns they read and write are
+    barriers, which form a level of their own. Between barriers a step
+    is placed in the level after the last step it depends on, i.e. the
+    last step writing a column it reads or writes, or reading a column
+    it writes. Executing the levels in order, and all steps within a
+    level on the same input, is therefore equivalent to executing the
+    steps in priority order.
+
+    Args:
+        steps (list): Steps in priority order.
+
+    Returns:
+        List of levels, each a list of positions in steps in priority order.
+    """
+    levels = []
+    segment_start = 0
+    step_levels = {}
+    for n, step in enumerate(steps):
+        if not declares_columns(step):
+            levels.append([n])
+            segment_start = len(levels)
+            continue
+        level = segment_start
+        for m in range(n):
+            if step_levels.get(m, -1) >= segment_start and _conflict(steps[m], step):
+                level = max(level, step_levels[m] + 1)
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(n)
+        step_levels[n] = level
+    return levels
+
+
+def merge_column_outputs(data: pd.DataFrame, steps, outputs) -> pd.DataFrame:
+    """Combines outputs of column assigning steps that were applied to data.
+
+    Args:
+        data (pd.DataFrame): Common input of the steps.
+        steps (list): Steps in priority order.
+        outputs (list): Primary output of each step.
+
+    Raises:
+        ValueError: If an output changed the index or other columns
+            than the declared ones.
+    """
+    assignments = {}
+    for step, output in zip(steps, outputs):
+        expected_columns = set(data.columns) | set(step.writes)
+        if (
+            not isinstance(output, pd.DataFrame)
+            or set(output.columns) != expected_columns
+            or not output.index.equals(data.index)
+        ):
+            raise ValueError(
+                f"Step {step.name} is executed concurrently as it declares its columns, "
+                "but it does not only assign the declared columns. Only declare reads "
+                "and writes for steps that keep the index and assign columns."
+            )
+        assignments.update({column: output[column] for column in step.writes})
+
+    if all(isinstance(column, str) for column in assignments):
+        return data.assign(**assignments)
+    merged = data.copy()
+    for column, values in assignments.items():
+        merged[column] = values
+    return merged
@@ -1,11 +1,42 @@
+import asyncio
+import contextvars
+import copy
+import hashlib
 import inspect
+import numbers
+import os
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, field
+from functools import partial
 from operator import attrgetter
 from typing import Callable
 
+import numpy as np
 import pandas as pd
 
+from data_steps.arrow import OUTPUTS, ArrowRoundTripError, as_frame, to_table
+from data_steps.cache import PrefixCache, ResultCache
+from data_steps.checkpoint import CheckpointStore
+from data_steps.dtypes import optimize_dtypes
 from data_steps.export import DataStepsStringExport
+from data_steps.fingerprint import data_fingerprint, globals_fingerprint, prefix_fingerprints
+from data_steps.history import RunHistory, performance_report
+from data_steps.hooks import Hooks, PipelineCall, StepCall, active_hooks
+from data_steps.library import LIBRARY_STEPS
+from data_steps.lint import lint_steps
+from data_steps.parallel import process_map, transform_partitions
+from data_steps.profiling import (
+    MEMORY_COLUMNS,
+    SUPERLINEAR_EXPONENT,
+    StepProfile,
+    fit_scaling,
+    measure,
+    measure_memory,
+)
+from data_steps.readers import read_frame
+from data_steps.scheduling import build_schedule, merge_column_outputs, required_columns
 
 
 @dataclass
@@ -13,12 +44,23 @@ class Step:
     priority: int
     function: Callable
     has_secondary_result: bool = False
+    mutates_input: bool = True
+    checkpoint: bool = False
+    row_local: bool = False
+    observe_only: bool = False
+    after_first: bool = False
+    reads: list = None
+    writes: list = None
     function_kwargs: dict = field(init=False)
 
     def __post_init__(self):
         argspec = inspect.getfullargspec(self.function)
         if len(argspec.args) == 0:
             raise ValueError("Steps need at least one argument")
+        if not isinstance(self.priority, numbers.Real):
+            raise ValueError(f"Priorities need to be numbers, not {self.priority!r}")
+        if self.observe_only and not self.has_secondary_result:
+            raise ValueError("Observe only steps need to have a secondary result")
         self._expected_kw = argspec.args[1:] + argspec.kwonlyargs
         args_defaults = argspec.defaults or []
         kwonly_defaults = argspec.kwonlydefaults or {}
@@ -28,6 +70,12 @@ class Step:
             **{arg: value for arg, value in combined_arg_defaults},
             **kwonly_defaults,
         }
+        self._bind()
+
+    def _bind(self):
+        # Binding the keyword arguments once avoids merging them on every call
+        self._call = partial(self.function, **self.function_kwargs)
+        self._is_async = inspect.iscoroutinefunction(self.function)
 
     @property
     def name(self):
@@ -39,6 +87,14 @@ class Step:
                 raise ValueError(f"Unexpected argument {key} for {self.function.__name__}")
         for key in kwargs:
             self.function_kwargs[key] = kwargs[key]
+        self._bind()
+
+    def copy(self) -> "Step":
+        """Copy of the step with its own keyword argument dictionary."""
+        step = copy.copy(self)
+        step.function_kwargs = dict(self.function_kwargs)
+        step._bind()
+        return step
 
     def apply(self, data):
         """Returns the results of applying the steps.
@@ -49,16 +105,95 @@ class Step:
         is not intended to be passed along and therefore optional.
         In case no secondary results have been calculated None is returned
         such that the return value is always a two tuple.
+        Coroutine functions are run to completion.
         """
-        step_result = self.function(data, **self.function_kwargs)
+        step_result = self._call(data)
+        if self._is_async:
+            step_result = _run_coroutine(step_result)
+        if self.has_secondary_result:
+            return step_result
+        return step_result, None
+
+    async def aapply(self, data):
+        """Like apply, but awaits coroutine functions and runs others in a thread."""
+        if self._is_async:
+            step_result = await self._call(data)
+        else:
+            # run_in_executor instead of asyncio.to_thread, which needs Python 3.9
+            loop = asyncio.get_running_loop()
+            step_result = await loop.run_in_executor(None, self._call, data)
+        return self._split(step_result)
+
+    def _split(self, step_result):
         if self.has_secondary_result:
             return step_result
         return step_result, None
 
 
+class RunResult:
+    """Results of a single pass through the steps.
+
+    Attributes:
+        transformed: Data after the last applied step.
+        secondary_results: Secondary results by step name. Results of
+            observe only steps running in the background are awaited on
+            first access, so callers using only the data do not wait.
+        step_metadata: One row per applied step in application order.
+            It can be passed as function without arguments building it,
+            which is only called on first access, as most callers of
+            run only use the data.
+
+    Secondary results that are also held by a cache are marked as
+    shared and copied on first access, such that callers cannot
+    modify the cached frames and series.
+    """
+
+    def __init__(
+        self,
+        transformed: pd.DataFrame,
+        secondary_results: dict,
+        step_metadata,
+        shared_results: bool = False,
+    ):
+        self.transformed = transformed
+        self._secondary_results = secondary_results
+        self._step_metadata = step_metadata
+        self._shared_results = shared_results
+
+    @property
+    def secondary_results(self) -> dict:
+        if self._shared_results:
+            self._secondary_results = _handed_out(_resolved(self._secondary_results))
+            self._shared_results = False
+        elif any(isinstance(result, Future) for result in self._secondary_results.values()):
+            self._secondary_results = _resolved(self._secondary_results)
+        return self._secondary_results
+
+    @property
+    def step_metadata(self) -> pd.DataFrame:
+        if not isinstance(self._step_metadata, pd.DataFrame):
+            self._step_metadata = self._step_metadata()
+        return self._step_metadata
+
+    def __repr__(self):
+        return (
+            f"RunResult(transformed={self.transformed!r}, "
+            f"secondary_results={self.secondary_results!r}, step_metadata={self.step_metadata!r})"
+        )
+
+
 class StepCollection:
+    """Registered steps together with their compiled execution plan.
+
+    The plan is the tuple of steps in application order. It is built
+    once whenever the collection changes and never modified afterwards.
+    Steps in a plan are not modified either, changing the keyword
+    arguments of a step replaces it by an updated copy instead.
+    """
+
     def __init__(self):
         self._collection: dict[str, Step] = {}
+        self._plan = ()
 
     def update_step(self, func, priority, **kwargs):
         active = kwargs.pop("active", True)
@@ -69,16 +204,39 @@ class StepCollection:
 
     def _add_step(self, func, priority, **kwargs):
         self._collection[func.__name__] = Step(priority, func, **kwargs)
+        self._publish()
 
     def _remove_step(self, func):
         del self._collection[func.__name__]
+        self._publish()
 
     def update_step_kwargs(self, function_name, kwargs):
-        self._collection[function_name].update_function_kwargs(kwargs)
+        step = self._collection[function_name].copy()
+        step.update_function_kwargs(kwargs)
+        self._collection[function_name] = step
+        self._publish()
+
+    def _publish(self):
+        steps = [step for step in self._collection.values() if not step.after_first]
+        steps.sort(key=attrgetter("priority"))
+        # Steps placed after the first step share its priority
+        following = [step for step in self._collection.values() if step.after_first]
+        if steps:
+            following = [_with_priority(step, steps[0].priority) for step in following]
+        # Replacing the reference is atomic, so concurrent readers see either plan
+        self._plan = tuple(steps[:1] + following + steps[1:])
+
+    @property
+    def plan(self) -> tuple:
+        """Steps in application order, compiled on the last change.
+
+        Users of a plan are not affected by later changes of the collection.
+        """
+        return self._plan
 
     @property
     def ordered_steps(self):
-        return sorted(self._collection.values(), key=attrgetter("priority"))
+        return self._plan
 
     def __iter__(self):
         return iter(self.ordered_steps)
@@ -98,10 +256,187 @@ class StepCollection:
         return overview
 
 
+def _with_priority(step: Step, priority: int) -> Step:
+    if step.priority == priority:
+        return step
+    step = step.copy()
+    step.priority = priority
+    return step
+
+
+def _run_coroutine(coroutine):
+    """Runs a coroutine to completion, also if an event loop runs in this thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+def _resolved(results: dict) -> dict:
+    """Secondary results with the results of background steps awaited."""
+    return {
+        name: result.result() if isinstance(result, Future) else result
+        for name, result in results.items()
+    }
+
+
+def _handed_out(results: dict) -> dict:
+    """Secondary results with copies of frames and series, which may be cached."""
+    return {
+        name: (
+            result.copy(deep=not _copy_on_write_enabled())
+            if isinstance(result, (pd.DataFrame, pd.Series))
+            else result
+        )
+        for name, result in results.items()
+    }
+
+
+def _same_dtypes(data, other) -> bool:
+    """Whether two frames or series have the same columns and dtypes."""
+    if isinstance(data, pd.DataFrame) and isinstance(other, pd.DataFrame):
+        return data.columns.equals(other.columns) and data.dtypes.equals(other.dtypes)
+    if isinstance(data, pd.Series) and isinstance(other, pd.Series):
+        return data.dtype == other.dtype
+    return False
+
+
+def _copy_on_write_enabled():
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    try:
+        return pd.options.mode.copy_on_write is True
+    except AttributeError:
+        return False
+
+
+def _step_metadata_frame(
+    steps, cached: int = 0, start: int = 0, measurements: dict = None, results: dict = None
+):
+    """Metadata of applied steps, the first cached from the cache and up to start restored.
+
+    Further columns of library steps, e.g. bytes_saved of dtype optimisation,
+    are taken from their secondary results, see LIBRARY_STEPS.
+    """
+    measurements = dict(measurements or {})
+    for n, step in enumerate(steps):
+        library_step = LIBRARY_STEPS.get(step.function)
+        if library_step is None or library_step.metadata is None:
+            continue
+        if results and step.name in results:
+            metadata = library_step.metadata(results[step.name])
+            measurements[n] = {**measurements.get(n, {}), **metadata}
+    positions = range(len(steps))
+    columns = {
+        "priority": [step.priority for step in steps],
+        "function_name": [step.name for step in steps],
+        "has_secondary_result": [step.has_secondary_result for step in steps],
+        "from_cache": [n < cached for n in positions],
+        "from_checkpoint": [cached <= n < start for n in positions],
+    }
+    for column in dict.fromkeys(column for values in measurements.values() for column in values):
+        columns[column] = [measurements.get(n, {}).get(column) for n in positions]
+    metadata = pd.DataFrame(columns)
+    metadata.index.rename("application_order", inplace=True)
+    return metadata
+
+
 class DataSteps:
-    def __init__(self, original: pd.DataFrame = None):
+    def __init__(
+        self,
+        original: pd.DataFrame = None,
+        cache_max_bytes: int = None,
+        copy_original: bool = True,
+        check_mutation: bool = False,
+        checkpoint_dir=None,
+        threads: int = None,
+        prune_columns: bool = False,
+        result_cache: ResultCache = None,
+        hooks: list = None,
+        history_path=None,
+        output: str = "pandas",
+    ):
+        """Container for data and the transformation steps applied to it.
+
+        Args:
+            original (pd.DataFrame, optional): Original data. Can also be
+                set later with set_original. Also accepts a pyarrow Table or
+                any dataframe supporting the Arrow PyCapsule stream or the
+                dataframe interchange protocol, which is converted to a frame
+                with Arrow backed dtypes without copying where possible.
+            cache_max_bytes (int, optional): If set, intermediate results after
+                each step are kept in memory up to this many bytes. Results of
+                the longest matching step prefix are then reused by transformed,
+                secondary_results and the partial variants, such that only the
+                steps after it are executed. Least recently used results are
+                evicted first. Disabled by default.
+            copy_original (bool, optional): If True (default) steps are applied
+                to a deep copy of the original. If False the deep copy is avoided.
+                With pandas Copy-on-Write enabled a shallow copy is used instead,
+                otherwise data is only deep copied before the first step that
+                does not declare mutates_input=False. Results may then share
+                memory with the original.
+            check_mutation (bool, optional): Debug option. If True every step
+                input is hashed before and after the step and a RuntimeError is
+                raised if the step modified its input in place.
+            checkpoint_dir (str or Path, optional): Directory in which the
+                results of steps registered with checkpoint=True are stored.
+                Runs resume from the last valid checkpoint instead of executing
+                the steps before it, also across processes. Checkpoints are
+                identified by the code and arguments of all steps up to the
+                checkpointed one and a hash of the original. Requires pyarrow.
+            threads (int, optional): Default number of threads for run, see there.
+            prune_columns (bool, optional): If True steps are applied to the
+                required_columns of the original only. The results then only
+                contain these and the written columns. Requires all steps to
+                declare the columns they read and write.
+            result_cache (ResultCache, optional): Cache of final results keyed
+                by the content of the input and a fingerprint of the steps. If
+                set, run, transformed, apply and transform_many return cached
+                results for inputs that were transformed by the same steps
+                before, without applying any step. The same cache can be
+                passed to several instances. Changes of mutable global
+                variables and of globals read only by functions the steps
+                call are not detected, see ResultCache.
+            hooks (list, optional): Instrumentation hooks notified about the
+                application of the steps of this instance, see add_hooks.
+            history_path (str or Path, optional): JSON lines file to which
+                the wall time, input shape and code fingerprint of every
+                applied step are appended for each run, see
+                performance_report.
+            output (str, optional): "pandas" (default) for transformed data
+                as pandas frames, "arrow" for pyarrow Tables, which reuse the
+                buffers of columns with Arrow backed dtypes. Applies to the
+                transformed data returned by transformed, partial_transform,
+                run, arun, apply, stream, transform_many, sweep, preview and
+                transformed_parallel. Requires pyarrow.
+
+        Raises:
+            ValueError: For an unknown output.
+        """
+        if output not in OUTPUTS:
+            raise ValueError(f"output must be one of {OUTPUTS}, not {output!r}")
         self._steps = StepCollection()
-        self._original = original
+        self._original = as_frame(original)
+        self._cache = PrefixCache(cache_max_bytes) if cache_max_bytes else None
+        self._copy_original = copy_original
+        self._check_mutation = check_mutation
+        self._checkpoints = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        self._original_fingerprint = None
+        self._profile = StepProfile()
+        self._threads = threads
+        self._prune_columns = prune_columns
+        self._observers = None
+        self._result_cache = result_cache
+        self._plan_fingerprint = None
+        self._result_key = None
+        self._hooks = tuple(hooks or ())
+        self._history = RunHistory(history_path) if history_path is not None else None
+        if self._history is not None:
+            self._hooks = (*self._hooks, self._history)
+        self._output = output
 
     @property
     def original(self) -> pd.DataFrame:
@@ -110,6 +445,26 @@ class DataSteps:
             raise Exception("Original data not set. ")
         return self._original
 
+    @property
+    def required_columns(self) -> list:
+        """Columns of the original that are read by the steps.
+
+        Determined from the columns the steps declare to read and
+        write. Columns that are written before they are read are
+        not required. Intended to only load the required columns,
+        e.g. with pd.read_parquet(..., columns=data.required_columns).
+
+        Raises:
+            ValueError: If any step does not declare its columns.
+        """
+        return required_columns(self._steps.ordered_steps)
+
+    def _pruned(self, data, steps):
+        """Data reduced to the columns required by steps if pruning is enabled."""
+        if not self._prune_columns:
+            return data
+        return data.loc[:, required_columns(steps)]
+
     def step(self, function=None, *, priority=5, active=True, **kwargs):
         """Decorator registering functions as steps.
 
@@ -135,10 +490,40 @@ class DataSteps:
             This is not passed along and is collected seperately in the
             secondary_results property. Usage might be for diagnostic
             summaries figure objects for plots etc.
+            mutates_input (bool, optional): Declares whether the function
+            may modify its input in place. Defaults to True. Steps declaring
+            False can receive the original without a copy if the DataSteps
+            instance is created with copy_original=False.
+            checkpoint (bool, optional): If True the result of the function
+            is stored in the checkpoint directory of the DataSteps instance.
+            Checkpoints are only used if none of the steps that are skipped
+            by resuming from it has a secondary result.
+            row_local (bool, optional): Declares that the result for each row
+            only depends on that row itself, e.g. for filters or column
+            assignments, but not for aggregations, sorting or deduplication.
+            Only pipelines of row local steps can be used with stream.
+            Leading row local steps are executed in parallel by
+            transformed_parallel.
+            reads (list, optional): Columns the function reads.
+            writes (list, optional): Columns the function assigns. Steps
+            declaring reads and writes must return their input with only
+            the written columns assigned, keeping the index. Steps that
+            neither write columns another of them reads or writes, nor
+            read columns another writes, are executed concurrently if
+            run is used with threads.
+            observe_only (bool, optional): Declares that the function only
+            computes its secondary result, e.g. a diagnostic summary or plot.
+            Its primary result is ignored and the input is passed along
+            unchanged. The function is executed on a copy of its input in a
+            background thread while the following steps are applied, and
+            its secondary result is awaited once it is needed. Requires
+            has_secondary_result=True. Observe only steps are not part of
+            exported transformation functions.
         """
 
         def register_function(func):
             self._steps.update_step(func, priority=priority, active=active, **kwargs)
+            self._discard_stale_cache()
             return func
 
         if function is None:
@@ -161,21 +546,12 @@ class DataSteps:
     @property
     def transformed(self):
         """Transformed data after all transformations."""
-        new_data = self.original.copy()
-        for step in self._steps:
-            new_data, _ = step.apply(new_data)
-        return new_data
+        return self.run().transformed
 
     @property
     def secondary_results(self):
         """All secondary results after all transformations."""
-        results = {}
-        new_data = self.original.copy()
-        for step in self._steps:
-            new_data, secondary_result = step.apply(new_data)
-            if secondary_result is not None:
-                results[step.name] = secondary_result
-        return results
+        return self.run().secondary_results
 
     def partial_secondary_results(self, n: int):
         """Shows secondary resutls data after the nth step.
@@ -186,13 +562,7 @@ class DataSteps:
                 the same arguments as partial_transform, but
                 will always return an empty dictionary.
         """
-        results = {}
-        new_data = self.original.copy()
-        for step in list(self._steps)[: n + 1]:
-            new_data, secondary_result = step.apply(new_data)
-            if secondary_result is not None:
-                results[step.name] = secondary_result
-        return results
+        return self.run(upto=n).secondary_results
 
     def partial_transform(self, n: int):
         """Shows transformed data after the nth step.
@@ -202,10 +572,980 @@ class DataSteps:
                 the data. Using -1 as input returns the orignal
                 data.
         """
-        new_data = self.original.copy()
-        for step in list(self._steps)[: n + 1]:
-            new_data, _ = step.apply(new_data)
-        return new_data
+        return self.run(upto=n).transformed
+
+    def run(
+        self,
+        upto: int = None,
+        profile: bool = False,
+        profile_memory: bool = False,
+        threads: int = None,
+    ) -> RunResult:
+        """Applies the steps to a copy of the original in a single pass.
+
+        Transformed data, secondary results and per step metadata
+        are returned together, such that the steps only need to be
+        executed once to obtain all of them.
+
+        With an enabled cache the longest cached prefix of steps
+        is used as a starting point and the results after every
+        executed step are cached. Cached data is never handed out
+        directly, but only as a copy such that neither steps nor
+        callers can modify it.
+
+        Args:
+            upto (int, optional): Step after which to stop. Has the same
+                meaning as n in partial_transform. By default all steps
+                are applied.
+            profile (bool, optional): If True all steps are executed without
+                reusing cached results or checkpoints and the step metadata
+                contains the wall and cpu time of each step as well as the
+                number of rows and columns of its input and output.
+            profile_memory (bool, optional): Like profile, but the step
+                metadata contains the memory usage of the input and output
+                of each step, the peak memory allocated during the step and
+                the columns that grew the most. Tracing memory slows down
+                the steps, so measured times are inflated if both options
+                are used.
+            threads (int, optional): If set, independent steps that declare
+                the columns they read and write are executed concurrently
+                on a pool of this many threads and their column outputs are
+                merged. Other steps are applied one after another. Results
+                are the same as for applying all steps in priority order.
+                Defaults to the threads of the instance. Ignored when
+                profiling, such that steps are measured one at a time.
+        """
+        return self._output_result(self._run_hooked(upto, profile, profile_memory, threads))
+
+    def _run_hooked(self, upto, profile, profile_memory, threads) -> RunResult:
+        hooks = active_hooks(self._hooks)
+        if hooks:
+            is_partial = upto is not None and upto + 1 < len(self._steps.plan)
+            with PipelineCall(hooks, self, is_partial, profile or profile_memory):
+                return self._run(upto, profile, profile_memory, threads)
+        return self._run(upto, profile, profile_memory, threads)
+
+    def _output_frame(self, data):
+        """Transformed data in the output format of the instance."""
+        if self._output == "arrow":
+            return to_table(data)
+        return data
+
+    def _output_result(self, result: RunResult) -> RunResult:
+        if self._output == "pandas":
+            return result
+        return RunResult(
+            self._output_frame(result.transformed),
+            result._secondary_results,
+            result._step_metadata,
+            result._shared_results,
+        )
+
+    def _run(self, upto, profile, profile_memory, threads) -> RunResult:
+        steps = self._steps.ordered_steps
+        if upto is not None:
+            steps = steps[: upto + 1]
+
+        new_data, results, start = self._pruned(self.original, self._steps.ordered_steps), {}, 0
+        if self._cache is not None:
+            prefix_keys = self._cache.prefix_keys(steps)
+        reuse = not (profile or profile_memory)
+        result_key = None
+        if self._result_cache is not None and reuse and len(steps) == len(self._steps.plan):
+            result_key = self._original_result_key()
+            entry = self._result_cache.get(result_key)
+            if entry is not None:
+                transformed, results = entry
+                return RunResult(
+                    self._unprotected_copy(transformed, cached=True)[0],
+                    dict(results),
+                    partial(_step_metadata_frame, steps, len(steps), results=results),
+                    shared_results=True,
+                )
+        threads = threads or self._threads
+        if reuse and not threads and self._cache is None and self._checkpoints is None:
+            # Without cache, checkpoints and concurrency the steps are applied in a plain loop
+            new_data, results = self._transform(steps, new_data)
+            shared = False
+            if result_key is not None:
+                results = _resolved(results)
+                shared = self._result_cache.put(result_key, new_data, results)
+                if shared:
+                    new_data, _ = self._unprotected_copy(new_data, cached=True)
+            return RunResult(
+                new_data, results, partial(_step_metadata_frame, steps, results=results), shared
+            )
+        if self._cache is not None and reuse:
+            start, entry = self._cache.longest_prefix(prefix_keys)
+            if entry is not None:
+                new_data, results = entry
+                results = dict(results)
+
+        # The original and cached results are protected, i.e. must neither
+        # be passed to steps that might modify them nor be handed out.
+        # in_cache tells whether the protected data is cached.
+        protected = True
+        in_cache = start > 0
+        cached = start
+        # Restored checkpoints are fresh data, which only need protection once cached
+        checkpoint_paths, code_fingerprints = self._checkpoint_paths(steps)
+        restored = self._restore_checkpoint(steps, start, checkpoint_paths) if reuse else None
+        if restored is not None:
+            start, new_data = restored
+            protected = self._cache is not None and self._cache.put(
+                prefix_keys[start - 1], (new_data, dict(results))
+            )
+            in_cache = protected
+
+        units = [[n] for n in range(start, len(steps))]
+        if threads and reuse:
+            units = [[start + n for n in level] for level in build_schedule(steps[start:])]
+        concurrent = any(len(unit) > 1 for unit in units)
+
+        measurements = {}
+        executed = start
+        with ThreadPoolExecutor(threads) if concurrent else nullcontext() as executor:
+            for unit in units:
+                if len(unit) > 1:
+                    new_data, secondary_results = self._apply_concurrently(
+                        [steps[n] for n in unit], new_data, executor
+                    )
+                    protected = in_cache = False
+                else:
+                    n = unit[0]
+                    if steps[n].observe_only and reuse:
+                        new_data, secondary_result = self._observe(steps[n], new_data)
+                    else:
+                        step_input = new_data
+                        if steps[n].observe_only:
+                            new_data = self._observed_copy(new_data)
+                        elif protected:
+                            new_data, protected = self._unprotected_copy(new_data, steps[n])
+                            in_cache = in_cache and protected
+                        if profile or profile_memory:
+                            (new_data, secondary_result), measurements[n] = self._measure_step(
+                                steps[n], new_data, profile, profile_memory
+                            )
+                        else:
+                            new_data, secondary_result = self._apply_step(steps[n], new_data)
+                        if steps[n].observe_only:
+                            new_data = step_input
+                    secondary_results = [secondary_result]
+                for n, secondary_result in zip(unit, secondary_results):
+                    if secondary_result is not None:
+                        results[steps[n].name] = secondary_result
+
+                # Checkpoints and cache entries require the data after a prefix of steps
+                executed += len(unit)
+                n = max(unit)
+                if n + 1 != executed:
+                    continue
+                if n in checkpoint_paths and not checkpoint_paths[n].exists():
+                    if self._checkpoints.save(checkpoint_paths[n], new_data):
+                        # Fingerprints from before the run, which the steps may have changed
+                        self._collect_checkpoints(code_fingerprints, unknown_steps=False)
+                if self._cache is not None and self._cache.put(
+                    prefix_keys[n], (new_data, dict(results))
+                ):
+                    protected = in_cache = True
+        if concurrent:
+            results = {step.name: results[step.name] for step in steps if step.name in results}
+        shared = self._cache is not None
+        if result_key is not None:
+            results = _resolved(results)
+            if self._result_cache.put(result_key, new_data, results):
+                protected = in_cache = shared = True
+        if protected:
+            new_data, _ = self._unprotected_copy(new_data, cached=in_cache)
+
+        return RunResult(
+            new_data,
+            results,
+            partial(_step_metadata_frame, steps, cached, start, measurements, results),
+            shared_results=shared,
+        )
+
+    def _measure_step(self, step: Step, data, profile: bool, profile_memory: bool):
+        measurements = {}
+
+        def apply(step, data):
+            if not profile:
+                return self._apply_step(step, data)
+            result, timing = measure(self._apply_step, step, data)
+            measurements.update(timing)
+            return result
+
+        if not profile_memory:
+            return apply(step, data), measurements
+        result, memory = measure_memory(apply, step, data)
+        return result, {**measurements, **memory}
+
+    def lint(self) -> pd.DataFrame:
+        """Known pandas performance anti-patterns in the code of the steps.
+
+        The source of each step is parsed without executing it and
+        searched for row wise apply, loops over iterrows or itertuples,
+        concatenation inside loops, chained indexing assignments,
+        conversions to object dtype and copies. The result has one row
+        per step aligned with steps, with the number of findings per
+        rule and messages with the line numbers of the findings. Counts
+        are missing for steps whose source is not available.
+        """
+        return lint_steps(self._steps.ordered_steps)
+
+    def memory_profile(self) -> pd.DataFrame:
+        """Overview of the steps together with their memory usage.
+
+        Runs all steps without reusing cached results or checkpoints
+        and returns the steps overview with the additional columns
+        bytes_in and bytes_out (deep memory usage of the input and
+        output), bytes_delta (their difference), peak_bytes (peak of
+        the memory allocated during the step as traced by tracemalloc)
+        and largest_column_growth (columns that grew the most by their
+        growth in bytes). Use run(profile_memory=True) to obtain the
+        measurements together with the transformed data. If steps
+        include the dtype optimisation, its savings are in the column
+        bytes_saved.
+        """
+        metadata = self.run(profile_memory=True).step_metadata
+        if metadata.empty:
+            return self.steps
+        columns = MEMORY_COLUMNS + [column for column in ["bytes_saved"] if column in metadata]
+        return self.steps.join(metadata.loc[:, columns])
+
+    def optimize_dtypes(self, priority: int = None, **rules) -> "DataSteps":
+        """Registers the built-in dtype optimisation as step.
+
+        The step narrows numeric dtypes and converts low cardinality
+        strings to category, or strings to Arrow backed strings, without
+        changing any value, see data_steps.dtypes.optimize_dtypes for
+        the rules. Its secondary result is a report of the converted
+        columns and the step metadata of run has the column bytes_saved
+        with the total savings. Registering it again replaces it.
+
+        Args:
+            priority (int, optional): Priority of the step. By default the
+                step is applied directly after the first step, whatever
+                its priority, and the steps overview shows the priority of
+                the first step.
+
+        Kwargs:
+            Rules passed to optimize_dtypes, i.e. integers, floats,
+            strings, max_category_ratio and exclude.
+        """
+        self._steps.update_step(
+            optimize_dtypes,
+            priority=5 if priority is None else priority,
+            has_secondary_result=True,
+            mutates_input=False,
+            after_first=priority is None,
+        )
+        if rules:
+            self._steps.update_step_kwargs(optimize_dtypes.__name__, rules)
+        self._discard_stale_cache()
+        return self
+
+    def profile(self, reset: bool = False) -> pd.DataFrame:
+        """Overview of the steps together with their cost.
+
+        Runs all steps without reusing cached results or checkpoints
+        and measures each of them. Measurements are accumulated over
+        all calls, such that repeated calls give more reliable times.
+        The steps overview is returned with the additional columns
+        calls (number of profiled executions), wall_time and cpu_time
+        (seconds summed over all profiled executions) as well as rows_in,
+        columns_in, rows_out and columns_out (shape of the input and
+        output in the last profiled execution).
+
+        Args:
+            reset (bool, optional): Discard measurements of previous calls.
+        """
+        if reset:
+            self._profile = StepProfile()
+        self._profile.add(self.run(profile=True).step_metadata)
+        return self._profile.overview(self.steps)
+
+    def preview(
+        self,
+        frac: float = None,
+        n: int = None,
+        stratify=None,
+        sizes: int = 3,
+        random_state: int = 0,
+    ) -> RunResult:
+        """Applies the steps to a sample of the original and extrapolates their cost.
+
+        The steps are applied to samples of increasing size, up to the
+        requested one, and the wall time of each step is fitted as a
+        power of its number of input rows. The fit is used to extrapolate
+        the time of each step on the full original. A warning lists the
+        steps whose time grows faster than linear. Samples are
+        reproducible for the same random_state and keep the order of
+        the original. Cached results and checkpoints are not used.
+
+        Args:
+            frac (float, optional): Fraction of the rows in the largest
+                sample. Defaults to 0.05 if n is not given either.
+            n (int, optional): Number of rows in the largest sample.
+            stratify (str or list, optional): Columns whose value
+                combinations keep their proportions in all samples.
+            sizes (int, optional): Number of sample sizes, each half of
+                the next larger one. At least two are needed for a fit,
+                otherwise linear scaling is assumed.
+            random_state (int, optional): Seed of the sampling.
+
+        Returns:
+            RunResult of the largest sample. Its step metadata contains the
+            input rows and wall time of each step on the largest sample, the
+            fitted scaling_exponent and the extrapolated_wall_time in seconds.
+
+        Raises:
+            ValueError: If both frac and n are given or sizes is less than 1.
+        """
+        if frac is not None and n is not None:
+            raise ValueError("Only one of frac and n can be given")
+        if sizes < 1:
+            raise ValueError(f"sizes must be at least 1, not {sizes}")
+        steps = self._steps.plan
+        original = self._pruned(self.original, steps)
+        n_rows = len(original)
+        target = n if n is not None else round((0.05 if frac is None else frac) * n_rows)
+        target = min(max(target, 1), n_rows)
+        positions = self._sample_order(original, stratify, np.random.default_rng(random_state))
+
+        rows_in, wall_times = {}, {}
+        for size in sorted({max(target >> (sizes - 1 - m), 1) for m in range(sizes)}):
+            data, results = original.iloc[np.sort(positions[:size])], {}
+            for m, step in enumerate(steps):
+                step_input = self._observed_copy(data) if step.observe_only else data
+                (output, secondary_result), timing = measure(self._apply_step, step, step_input)
+                if not step.observe_only:
+                    data = output
+                if secondary_result is not None:
+                    results[step.name] = secondary_result
+                rows_in.setdefault(m, []).append(timing["rows_in"] or 0)
+                wall_times.setdefault(m, []).append(timing["wall_time"])
+
+        measurements, superlinear = {}, []
+        for m, step in enumerate(steps):
+            exponent, coefficient = fit_scaling(rows_in[m], wall_times[m])
+            # An empty original is its own sample
+            full_rows = rows_in[m][-1] * n_rows / target if target else 0
+            measurements[m] = {
+                "sample_rows_in": rows_in[m][-1],
+                "sample_wall_time": wall_times[m][-1],
+                "scaling_exponent": exponent,
+                "extrapolated_wall_time": coefficient * full_rows**exponent,
+            }
+            if exponent > SUPERLINEAR_EXPONENT:
+                superlinear.append(f"{step.name} (exponent {exponent:.2f})")
+        if superlinear:
+            warnings.warn(
+                f"Steps scaling superlinearly with the number of rows: {', '.join(superlinear)}",
+                stacklevel=2,
+            )
+        return self._output_result(
+            RunResult(data, results, _step_metadata_frame(steps, measurements=measurements))
+        )
+
+    @staticmethod
+    def _sample_order(data, stratify, rng):
+        """Random order of the row positions of data.
+
+        With stratify the rows of each group are spread evenly over
+        the order, such that every prefix is a stratified sample.
+        """
+        positions = rng.permutation(len(data))
+        if stratify is None:
+            return positions
+        groups = data.iloc[positions].groupby(stratify, sort=False, dropna=False)
+        codes = groups.ngroup().to_numpy()
+        ranks = groups.cumcount().to_numpy()
+        keys = (ranks + 0.5) / np.bincount(codes)[codes]
+        return positions[np.argsort(keys, kind="stable")]
+
+    def transformed_parallel(self, workers: int = None, partitions: int = None):
+        """Transformed data using a pool of processes.
+
+        The original is split into row partitions. The leading steps
+        that are row local and have no secondary result are applied
+        to the partitions in worker processes and the partitions are
+        concatenated in order. All further steps are applied afterwards
+        in the current process. Partitions are passed to and from the
+        workers as Arrow data in shared memory. This requires Python 3.8
+        or later, pyarrow and step functions that can be pickled, e.g.
+        functions defined at module level. If the partitions or their
+        results would change by the exchange through Arrow, e.g. object
+        columns of integers and None, a warning is issued and the data
+        is transformed in the current process instead. The result is the same as for transformed, as long as the
+        dtypes produced by the parallel steps do not depend on the values
+        of the rows. Categorical columns with different categories per
+        partition are combined with the union of their categories, other
+        dtypes differing between partitions are warned about.
+
+        Args:
+            workers (int, optional): Number of processes. Defaults to the
+                number of CPUs.
+            partitions (int, optional): Number of row partitions. Defaults
+                to the number of workers.
+        """
+        steps = self._steps.ordered_steps
+        n_parallel = self._leading_row_local(steps)
+        if n_parallel == 0:
+            return self.transformed
+
+        try:
+            new_data = transform_partitions(
+                self._pruned(self.original, steps), steps[:n_parallel], workers, partitions
+            )
+        except ArrowRoundTripError as error:
+            warnings.warn(f"{error}, transforming in the current process instead.", stacklevel=2)
+            return self.transformed
+        # Secondary results are discarded, so observe only steps are skipped
+        new_data, _ = self._transform(steps[n_parallel:], new_data, protected=False, observe=False)
+        return self._output_frame(new_data)
+
+    @staticmethod
+    def _leading_row_local(steps) -> int:
+        """Number of leading steps that are row local and have no secondary result."""
+        n = 0
+        while n < len(steps) and steps[n].row_local and not steps[n].has_secondary_result:
+            n += 1
+        return n
+
+    def stream(self, chunks):
+        """Lazily applies all steps to each frame of an iterable.
+
+        Intended for data that does not fit into memory, e.g. when
+        reading with pd.read_csv(..., chunksize=...) or reading
+        row groups of parquet files. Only one chunk needs to be
+        in memory at a time. This requires all steps to be declared
+        as row_local. Secondary results of steps are discarded.
+
+        Args:
+            chunks (iterable): Frames that are transformed one by one, or
+                Arrow record batches and tables, e.g. of
+                pyarrow.parquet.ParquetFile.iter_batches.
+
+        Returns:
+            A generator of the transformed chunks.
+
+        Raises:
+            ValueError: If any step is not declared as row_local.
+        """
+        steps = self._steps.ordered_steps
+        not_row_local = [step.name for step in steps if not step.row_local]
+        if not_row_local:
+            raise ValueError(
+                "Streaming requires all steps to be row local, but the steps "
+                f"{', '.join(not_row_local)} are not declared with row_local=True"
+            )
+        return self._stream(steps, chunks)
+
+    def _stream(self, steps, chunks):
+        for chunk in chunks:
+            hooks = active_hooks(self._hooks)
+            with PipelineCall(hooks, self) if hooks else nullcontext():
+                transformed, _ = self._transform(
+                    steps, self._pruned(as_frame(chunk), steps), observe=False
+                )
+            yield self._output_frame(transformed)
+
+    def _transform(self, steps, data, protected: bool = True, observe: bool = True):
+        """Applies steps to data, which must not be modified if protected.
+
+        Returns the transformed data and the secondary results, with
+        futures for the results of observe only steps running in the
+        background. Observe only steps are skipped if observe is False.
+        """
+        results = {}
+        apply_step = self._step_applier()
+        for step in steps:
+            if step.observe_only:
+                if observe:
+                    _, results[step.name] = self._observe(step, data)
+                continue
+            if protected:
+                data, protected = self._unprotected_copy(data, step)
+            data, secondary_result = apply_step(step, data)
+            if secondary_result is not None:
+                results[step.name] = secondary_result
+        if protected:
+            data, _ = self._unprotected_copy(data)
+        return data, results
+
+    def _pipeline_fingerprint(self) -> str:
+        """Fingerprint of all steps and options affecting results.
+
+        It is computed once per plan and recomputed when global constants
+        read by the steps change.
+        """
+        plan = self._steps.plan
+        constants = globals_fingerprint(plan)
+        memo = self._plan_fingerprint
+        if memo is None or memo[0] is not plan or memo[1] != constants:
+            fingerprints = prefix_fingerprints(plan)[-1:]
+            digest = hashlib.sha256(repr((fingerprints, self._prune_columns)).encode())
+            self._plan_fingerprint = (plan, constants, digest.hexdigest())
+        return self._plan_fingerprint[2]
+
+    def _original_result_key(self) -> str:
+        """Result cache key of the original, hashing the original once per pipeline."""
+        pipeline_fingerprint = self._pipeline_fingerprint()
+        if self._result_key is None or self._result_key[0] != pipeline_fingerprint:
+            key = self._result_cache.key(self.original, pipeline_fingerprint)
+            self._result_key = (pipeline_fingerprint, key)
+        return self._result_key[1]
+
+    def _transform_cached(self, data, protected: bool = True, observe: bool = True):
+        """Applies all steps like _transform, using the result cache if enabled."""
+        hooks = active_hooks(self._hooks)
+        if hooks:
+            with PipelineCall(hooks, self):
+                return self._transform_uninstrumented(data, protected, observe)
+        return self._transform_uninstrumented(data, protected, observe)
+
+    def _transform_uninstrumented(self, data, protected: bool, observe: bool):
+        steps = self._steps.plan
+        if self._result_cache is None:
+            return self._transform(steps, self._pruned(data, steps), protected, observe)
+        key = self._result_cache.key(data, self._pipeline_fingerprint())
+        entry = self._result_cache.get(key)
+        if entry is None:
+            # Cached results need the secondary results of observe only steps as well
+            transformed, results = self._transform(steps, self._pruned(data, steps), protected)
+            results = _resolved(results)
+            if not self._result_cache.put(key, transformed, results):
+                return transformed, results
+            entry = (transformed, results)
+        transformed, results = entry
+        return self._unprotected_copy(transformed, cached=True)[0], _handed_out(results)
+
+    def _run_item(self, item) -> RunResult:
+        """Runs the plan on a frame or the frame stored at a path, which may be modified."""
+        steps = self._steps.plan
+        if isinstance(item, (str, os.PathLike)):
+            columns = required_columns(steps) if self._prune_columns else None
+            item = read_frame(item, columns=columns)
+        transformed, results = self._transform_cached(as_frame(item), protected=False)
+        return self._output_result(RunResult(transformed, results, _step_metadata_frame(steps)))
+
+    def _detached(self) -> "DataSteps":
+        """Copy of the steps and options without original, cache and checkpoints."""
+        detached = DataSteps(
+            copy_original=self._copy_original,
+            check_mutation=self._check_mutation,
+            prune_columns=self._prune_columns,
+            result_cache=self._result_cache,
+            output=self._output,
+        )
+        detached._steps = self._steps
+        return detached
+
+    def sweep(self, step_name: str, kwargs_list, workers: int = None, reduce=None) -> list:
+        """Results of all steps for several keyword arguments of one step.
+
+        The steps before the swept step are applied once, using the
+        cache and checkpoints like run. The swept step and all steps
+        after it are then applied to this shared intermediate result
+        for each candidate on a pool of threads. Results are the same
+        as for calling update_step_kwargs and run for each candidate
+        in turn, but the keyword arguments of the step are not changed.
+
+        Args:
+            step_name (str): Name of the swept step.
+            kwargs_list (list): Keyword argument updates of the step,
+                one dictionary per candidate.
+            workers (int, optional): Number of threads. Defaults to the
+                threads of the instance, or 1.
+            reduce (callable, optional): Function applied to the RunResult
+                of each candidate in the worker threads, e.g. to compute a
+                score instead of keeping all transformed data in memory.
+
+        Returns:
+            The RunResult, or its reduction, for each candidate in order.
+
+        Raises:
+            ValueError: If there is no step with the name or a candidate
+                contains unexpected keyword arguments.
+        """
+        steps = self._steps.plan
+        positions = [n for n, step in enumerate(steps) if step.name == step_name]
+        if not positions:
+            raise ValueError(f"There is no step {step_name}")
+        n = positions[0]
+        candidates = []
+        for kwargs in kwargs_list:
+            candidate = steps[n].copy()
+            candidate.update_function_kwargs(kwargs)
+            candidates.append((candidate, *steps[n + 1 :]))
+        prefix = self._run_hooked(n - 1, False, False, None)
+
+        def run_candidate(suffix):
+            transformed, results = self._transform(suffix, prefix.transformed)
+            metadata = pd.concat(
+                [prefix.step_metadata, _step_metadata_frame(suffix)], ignore_index=True
+            )
+            metadata.index.rename("application_order", inplace=True)
+            result = self._output_result(
+                RunResult(
+                    transformed,
+                    {**prefix._secondary_results, **results},
+                    metadata,
+                    prefix._shared_results,
+                )
+            )
+            return result if reduce is None else reduce(result)
+
+        with ThreadPoolExecutor(workers or self._threads or 1) as executor:
+            return list(executor.map(run_candidate, candidates))
+
+    def transform_many(
+        self, items, workers: int = None, ordered: bool = True, max_in_flight: int = None
+    ):
+        """Lazily runs all steps on many frames in a pool of processes.
+
+        The steps are sent to each worker process once. Items are
+        submitted as workers become free, such that at most max_in_flight
+        inputs and results are held at a time, even for long or unbounded
+        iterables. Items given as paths are read by the workers, so only
+        their results are sent between processes. Like apply this does
+        not use the original, the cache or checkpoints. Step functions
+        must be picklable, e.g. functions defined at module level.
+
+        Args:
+            items (iterable): Frames, pyarrow Tables or paths of parquet,
+                feather, csv or pickle files.
+            workers (int, optional): Number of processes. Defaults to the
+                number of CPUs.
+            ordered (bool, optional): If True (default) results are yielded
+                in the order of the items, otherwise as soon as they are ready.
+            max_in_flight (int, optional): Maximal number of submitted items
+                whose results have not been yielded yet. Defaults to twice
+                the number of workers.
+
+        Returns:
+            A generator of the position of each item and its RunResult.
+        """
+        return process_map(self._detached()._run_item, items, workers, ordered, max_in_flight)
+
+    def apply(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Transforms data with all steps, independent of the original.
+
+        In contrast to set_original followed by transformed this does
+        not change the state of the instance. The steps and their
+        keyword arguments are taken from the compiled plan, which is
+        replaced as a whole whenever steps are registered or updated. One
+        instance can therefore serve concurrent calls from several
+        threads without locks, while updates only affect calls that
+        start afterwards. Cached results and checkpoints are not used
+        and secondary results are discarded, so observe only steps are
+        skipped. Calling the instance itself is equivalent.
+
+        Args:
+            data (pd.DataFrame): Data to transform. It is not modified. Can
+                also be a pyarrow Table or another dataframe, see DataSteps.
+        """
+        return self._output_frame(self._transform_cached(as_frame(data), observe=False)[0])
+
+    def __call__(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self.apply(data)
+
+    async def arun(self, data: pd.DataFrame = None) -> RunResult:
+        """Applies all steps without blocking the event loop.
+
+        Steps defined with async def are awaited, other steps are run
+        in the default executor of the event loop. Steps that declare
+        the columns they read and write and are independent of each
+        other are awaited concurrently, as for run with threads. Like
+        apply this does not change the state of the instance and does
+        not use cached results or checkpoints.
+
+        Args:
+            data (pd.DataFrame, optional): Data to transform, which is not
+                modified. Defaults to the original.
+        """
+        hooks = active_hooks(self._hooks)
+        if hooks:
+            with PipelineCall(hooks, self):
+                return self._output_result(await self._arun(as_frame(data)))
+        return self._output_result(await self._arun(as_frame(data)))
+
+    async def _arun(self, data) -> RunResult:
+        steps = self._steps.plan
+        new_data = self._pruned(self.original if data is None else data, steps)
+        results, protected = {}, True
+        for level in build_schedule(steps):
+            level_steps = [steps[n] for n in level]
+            for step in level_steps:
+                if step.observe_only:
+                    results[step.name] = asyncio.create_task(
+                        self._aobserved_result(step, self._observed_copy(new_data))
+                    )
+            level_steps = [step for step in level_steps if not step.observe_only]
+            if not level_steps:
+                continue
+            if len(level_steps) > 1:
+                outputs = await asyncio.gather(
+                    *(
+                        self._aapply_step(step, self._isolated_copy(new_data, step))
+                        for step in level_steps
+                    )
+                )
+                new_data = merge_column_outputs(
+                    new_data, level_steps, [output for output, _ in outputs]
+                )
+                protected = False
+            else:
+                if protected:
+                    new_data, protected = self._unprotected_copy(new_data, level_steps[0])
+                outputs = [await self._aapply_step(level_steps[0], new_data)]
+                new_data = outputs[0][0]
+            for step, (_, secondary_result) in zip(level_steps, outputs):
+                if secondary_result is not None:
+                    results[step.name] = secondary_result
+        if protected:
+            new_data, _ = self._unprotected_copy(new_data)
+        for name, result in results.items():
+            if isinstance(result, asyncio.Task):
+                results[name] = await result
+        results = {step.name: results[step.name] for step in steps if step.name in results}
+        return RunResult(new_data, results, _step_metadata_frame(steps))
+
+    def _checkpoint_paths(self, steps):
+        """Checkpoint paths of the checkpointed steps by position.
+
+        Also returns the code fingerprints of all checkpointed steps of
+        the plan by name, which the paths are built from.
+        """
+        if self._checkpoints is None or not any(step.checkpoint for step in steps):
+            return {}, {}
+        if self._original_fingerprint is None:
+            self._original_fingerprint = data_fingerprint(
+                self._pruned(self.original, self._steps.ordered_steps)
+            )
+        code_fingerprints = self._code_fingerprints()
+        paths = {
+            n: self._checkpoints.path(
+                step.name, code_fingerprints[step.name], self._original_fingerprint
+            )
+            for n, step in enumerate(steps)
+            if step.checkpoint
+        }
+        return paths, code_fingerprints
+
+    def _code_fingerprints(self) -> dict:
+        """Code fingerprints of the checkpointed steps of the plan by name."""
+        steps = self._steps.ordered_steps
+        return {
+            step.name: code_fingerprint
+            for step, code_fingerprint in zip(steps, prefix_fingerprints(steps))
+            if step.checkpoint
+        }
+
+    def _restore_checkpoint(self, steps, start, checkpoint_paths):
+        """Position after and data of the last usable checkpoint not before start."""
+        for n in sorted(checkpoint_paths, reverse=True):
+            if n < start:
+                break
+            skipped = steps[start : n + 1]
+            if checkpoint_paths[n].exists() and not any(
+                step.has_secondary_result for step in skipped
+            ):
+                return n + 1, self._checkpoints.load(checkpoint_paths[n])
+        return None
+
+    def clean_checkpoints(self, unknown_steps: bool = True) -> list:
+        """Deletes stale checkpoints and returns their paths.
+
+        Checkpoints are stale if the code or arguments of the
+        checkpointed step or any step before it changed, or if
+        the step is no longer checkpointed. Checkpoints for other
+        original data are kept. Stale checkpoints of the steps of the
+        pipeline are also deleted whenever a new checkpoint is written.
+
+        Args:
+            unknown_steps (bool, optional): Also delete checkpoints of
+                steps that are not part of the pipeline. Set it to False
+                if several pipelines share the checkpoint directory.
+        """
+        if self._checkpoints is None:
+            return []
+        return self._collect_checkpoints(self._code_fingerprints(), unknown_steps)
+
+    def _collect_checkpoints(self, code_fingerprints: dict, unknown_steps: bool) -> list:
+        steps = self._steps.ordered_steps
+        return self._checkpoints.collect_garbage(
+            code_fingerprints, step_names=None if unknown_steps else [step.name for step in steps]
+        )
+
+    def _unprotected_copy(self, data, step: Step = None, cached: bool = False):
+        """Copy of protected data that step may receive.
+
+        Returns the copy and whether it is still protected, which
+        is only the case if copying was skipped because the step
+        declares to not mutate its input. Without a step the copy
+        is intended to be handed out. Cached data is always copied
+        before it is handed out, the original only if copy_original
+        is set.
+        """
+        if self._copy_original:
+            return data.copy(), False
+        if _copy_on_write_enabled():
+            return data.copy(deep=False), False
+        if (step is None and cached) or (step is not None and step.mutates_input):
+            return data.copy(), False
+        return data, True
+
+    def _apply_concurrently(self, steps, data, executor):
+        """Applies column assigning steps concurrently and merges their outputs."""
+        futures = {
+            n: executor.submit(
+                # The context holds the current pipeline call, see hooks.current_call
+                contextvars.copy_context().run,
+                self._apply_step,
+                step,
+                self._isolated_copy(data, step),
+            )
+            for n, step in enumerate(steps)
+            if not step.observe_only
+        }
+        outputs = [
+            futures[n].result() if n in futures else self._observe(step, data)
+            for n, step in enumerate(steps)
+        ]
+        new_data = merge_column_outputs(data, steps, [output for output, _ in outputs])
+        return new_data, [secondary_result for _, secondary_result in outputs]
+
+    def _observe(self, step: Step, data):
+        """Starts an observe only step in the background.
+
+        Returns data and the future of the secondary result.
+        """
+        if self._observers is None:
+            self._observers = ThreadPoolExecutor(thread_name_prefix="data_steps_observer")
+        future = self._observers.submit(
+            contextvars.copy_context().run,
+            self._observed_result,
+            step,
+            self._observed_copy(data),
+        )
+        return data, future
+
+    def _observed_result(self, step: Step, data):
+        return self._apply_step(step, data)[1]
+
+    async def _aobserved_result(self, step: Step, data):
+        return (await self._aapply_step(step, data))[1]
+
+    @staticmethod
+    def _observed_copy(data):
+        """Copy of data that is not affected by later steps modifying data in place."""
+        return data.copy(deep=not _copy_on_write_enabled())
+
+    @staticmethod
+    def _isolated_copy(data, step: Step):
+        """Copy of data that step can modify without affecting others."""
+        if _copy_on_write_enabled():
+            return data.copy(deep=False)
+        if step.mutates_input:
+            return data.copy()
+        return data
+
+    def _step_applier(self):
+        """Function applying a step, skipping instrumentation that is not enabled."""
+        if self._check_mutation or active_hooks(self._hooks):
+            return self._apply_step
+        return Step.apply
+
+    def _apply_step(self, step: Step, data):
+        hooks = active_hooks(self._hooks)
+        if hooks:
+            with StepCall(hooks, self, step, data) as call:
+                call.result = self._apply_step_uninstrumented(step, data)
+            return call.result
+        return self._apply_step_uninstrumented(step, data)
+
+    def _apply_step_uninstrumented(self, step: Step, data):
+        if not self._check_mutation:
+            return step.apply(data)
+        fingerprint = data_fingerprint(data)
+        result = step.apply(data)
+        self._verify_unmodified(step, data, fingerprint)
+        return result
+
+    async def _aapply_step(self, step: Step, data):
+        hooks = active_hooks(self._hooks)
+        if hooks:
+            with StepCall(hooks, self, step, data) as call:
+                call.result = await self._aapply_step_uninstrumented(step, data)
+            return call.result
+        return await self._aapply_step_uninstrumented(step, data)
+
+    async def _aapply_step_uninstrumented(self, step: Step, data):
+        if not self._check_mutation:
+            return await step.aapply(data)
+        fingerprint = data_fingerprint(data)
+        result = await step.aapply(data)
+        self._verify_unmodified(step, data, fingerprint)
+        return result
+
+    @staticmethod
+    def _verify_unmodified(step: Step, data, fingerprint: str):
+        if data_fingerprint(data) != fingerprint:
+            raise RuntimeError(
+                f"Step {step.name} modified its input in place. Return a modified copy instead."
+            )
+
+    def _discard_stale_cache(self):
+        if self._cache is not None:
+            self._cache.discard_stale(self._cache.prefix_keys(self._steps.ordered_steps))
+
+    def clear_cache(self):
+        """Removes all cached intermediate results."""
+        if self._cache is not None:
+            self._cache.clear()
+
+    def add_hooks(self, hooks: Hooks):
+        """Adds instrumentation hooks to this instance.
+
+        Hooks are notified when run, transformed and the other
+        properties based on it, apply, arun and each chunk of stream
+        start and end applying the steps, and before and after each
+        step. Hooks for all instances are registered with
+        data_steps.hooks.register_hooks instead. Without any hooks
+        no instrumentation code is executed. Hooks are not passed to
+        worker processes of transform_many and transformed_parallel.
+        """
+        self._hooks = (*self._hooks, hooks)
+
+    def remove_hooks(self, hooks: Hooks):
+        """Removes instrumentation hooks added to this instance."""
+        self._hooks = tuple(added for added in self._hooks if added is not hooks)
+
+    def performance_report(self, threshold: float = 1.5, window: int = 20) -> pd.DataFrame:
+        """Compares the step timings of the last run with the run history.
+
+        Times per input row of each step of the last successful run are
+        compared with their median over the previous runs in the window.
+        Steps slower by more than the threshold factor are marked as
+        regression, together with the likely cause, i.e. the step itself
+        if its code or keyword arguments changed since the previous run,
+        or otherwise the closest step before it that changed. Steps
+        whose results are taken from the cache or checkpoints are not
+        executed and therefore missing in the recorded runs.
+
+        Args:
+            threshold (float, optional): Factor of the baseline time per row
+                above which a step is marked as regression.
+            window (int, optional): Number of previous runs in the baseline.
+
+        Raises:
+            ValueError: If the instance was created without history_path.
+        """
+        if self._history is None:
+            raise ValueError("Performance reports require a history_path, see DataSteps.")
+        return performance_report(self._history.runs(), threshold, window)
 
     def set_original(self, original: pd.DataFrame) -> "DataSteps":
         """Set the original of the data.
@@ -219,8 +1559,51 @@ class DataSteps:
         The method returns the DataSteps instance itself
         such that it can coveniently be chained with the
         with the transform property when needed.
+
+        Like the original passed to the constructor it can also be
+        a pyarrow Table or another dataframe, see DataSteps.
         """
-        self._original = original
+        self._original = as_frame(original)
+        self._original_fingerprint = None
+        self._result_key = None
+        self.clear_cache()
+        return self
+
+    def append_original(self, new_rows: pd.DataFrame) -> "DataSteps":
+        """Appends rows to the original, reusing cached results for the old rows.
+
+        Only the new rows are passed through the leading steps that are
+        row local and have no secondary result, and appended to the
+        cached result after these steps. Later runs continue from there,
+        so all further steps are applied to the full data again. Without
+        a cache, or if the result after the leading steps is not cached,
+        this is equivalent to set_original with all rows. This is also
+        the case if the leading steps give other dtypes for the new rows
+        than for the old ones, e.g. categoricals with other categories,
+        as the concatenation could then differ from applying the steps
+        to all rows.
+
+        The method returns the DataSteps instance itself
+        like set_original.
+
+        Args:
+            new_rows (pd.DataFrame): Rows to append, with the same columns
+                as the original.
+        """
+        new_rows = as_frame(new_rows)
+        steps = self._steps.ordered_steps
+        n_local = self._leading_row_local(steps)
+        entry = None
+        if self._cache is not None and n_local > 0:
+            key = self._cache.prefix_keys(steps[:n_local])[-1]
+            entry = self._cache.get(key)
+
+        self.set_original(pd.concat([self.original, new_rows]))
+        if entry is not None:
+            data, results = entry
+            new_data, _ = self._transform(steps[:n_local], self._pruned(new_rows, steps))
+            if _same_dtypes(data, new_data):
+                self._cache.put(key, (pd.concat([data, new_data]), results))
         return self
 
     def update_step_kwargs(self, step_name: str, kwargs):
@@ -242,6 +1625,7 @@ class DataSteps:
                 for the update.
         """
         self._steps.update_step_kwargs(step_name, kwargs)
+        self._discard_stale_cache()
 
     def export(self, name=None, without_data_steps=False):
         """Exports Data Steps as a String.
@@ -270,6 +1654,8 @@ class DataSteps:
                 not rely on the datasteps module. Instead a
                 function is created that applies all the
                 transformations. The default name of the function
-                is the name of the DataSteps instance.
+                is the name of the DataSteps instance. If any step
+                is a coroutine function, the exported function is a
+                coroutine function awaiting it as well.
         """
         return DataStepsStringExport(self._steps, name, without_data_steps=without_data_steps)
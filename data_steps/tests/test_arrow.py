@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from data_steps.arrow import as_frame, to_table
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+def _address(column):
+    return column.chunks[0].buffers()[1].address
+
+
+def test_as_frame_table(raw_frame):
+    table = pa.Table.from_pandas(raw_frame)
+    frame = as_frame(table)
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in frame.dtypes)
+    assert frame.index.equals(raw_frame.index)
+    assert frame.astype({"Col1": "int64", "Col3": "float64"}).Col1.equals(raw_frame.Col1)
+    # Arrow buffers are reused
+    assert _address(frame["Col1"].array._pa_array) == _address(table.column("Col1"))
+
+    batch = table.to_batches()[0]
+    assert as_frame(batch).equals(frame)
+    assert as_frame(raw_frame) is raw_frame
+    assert as_frame(None) is None
+
+
+def test_as_frame_protocols(raw_frame):
+    class StreamOnly:
+        def __arrow_c_stream__(self, requested_schema=None):
+            return pa.Table.from_pandas(raw_frame).__arrow_c_stream__(requested_schema)
+
+    assert as_frame(StreamOnly()).Col2.tolist() == raw_frame.Col2.tolist()
+    with pytest.warns(Warning):
+        interchange = raw_frame.__dataframe__()
+    assert as_frame(interchange).Col1.tolist() == raw_frame.Col1.tolist()
+    values = [1, 2, 3]
+    assert as_frame(values) is values
+    series = raw_frame.Col1
+    assert as_frame(series) is series
+
+
+def test_to_table(raw_frame):
+    frame = as_frame(pa.Table.from_pandas(raw_frame))
+    table = to_table(frame)
+    assert table.column_names == ["Col1", "Col2", "Col3"]
+    assert _address(table.column("Col1")) == _address(frame["Col1"].array._pa_array)
+    assert as_frame(table).equals(frame)
@@ -0,0 +1,127 @@
+import pickle
+
+import pandas as pd
+
+from data_steps.cache import LRUCache, PrefixCache, ResultCache, estimate_size
+from data_steps.single_frame import Step
+
+
+def test_estimate_size_frame():
+    frame = pd.DataFrame({"a": range(100)})
+    assert estimate_size(frame) == frame.memory_usage(deep=True).sum()
+
+
+def test_estimate_size_series():
+    series = pd.Series(["a", "bb", "ccc"])
+    assert estimate_size(series) == series.memory_usage(deep=True)
+
+
+def test_lru_eviction():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", "value_a", size=4)
+    cache.put("b", "value_b", size=4)
+    assert cache.get("a") == "value_a"
+    cache.put("c", "value_c", size=4)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.nbytes == 8
+
+
+def test_lru_too_large_entry():
+    cache = LRUCache(max_bytes=10)
+    assert not cache.put("a", "value_a", size=11)
+    assert len(cache) == 0
+
+
+def test_lru_replace_entry():
+    cache = LRUCache(max_bytes=10)
+    cache.put("a", "old", size=6)
+    cache.put("a", "new", size=3)
+    assert cache.get("a") == "new"
+    assert cache.nbytes == 3
+
+
+def test_prefix_keys_kwargs_update():
+    def first(dummy, a=1):
+        ...
+
+    def second(dummy):
+        ...
+
+    cache = PrefixCache(max_bytes=1000)
+    steps = [Step(priority=1, function=first), Step(priority=2, function=second)]
+    keys = cache.prefix_keys(steps)
+    assert len(keys) == 2
+
+    steps[1].update_function_kwargs({})
+    assert cache.prefix_keys(steps) == keys
+
+    steps[0].update_function_kwargs({"a": 2})
+    new_keys = cache.prefix_keys(steps)
+    assert new_keys[0] != keys[0]
+    assert new_keys[1] != keys[1]
+
+
+def test_prefix_keys_unhashable_kwargs():
+    def first(dummy, a=None):
+        ...
+
+    cache = PrefixCache(max_bytes=1000)
+    step = Step(priority=1, function=first)
+    step.update_function_kwargs({"a": [1, 2]})
+    key = cache.prefix_keys([step])[0]
+    step.function_kwargs["a"].append(3)
+    assert cache.prefix_keys([step])[0] != key
+
+
+def test_longest_prefix_and_discard_stale():
+    def first(dummy):
+        ...
+
+    def second(dummy):
+        ...
+
+    cache = PrefixCache(max_bytes=10_000)
+    steps = [Step(priority=1, function=first), Step(priority=2, function=second)]
+    keys = cache.prefix_keys(steps)
+    assert cache.longest_prefix(keys) == (0, None)
+
+    cache.put(keys[0], (pd.DataFrame({"a": [1]}), {}))
+    covered, (data, _) = cache.longest_prefix(keys)
+    assert covered == 1
+    assert data["a"].tolist() == [1]
+
+    cache.put(keys[1], (pd.DataFrame({"a": [2]}), {}))
+    cache.discard_stale(keys[:1])
+    assert keys[0] in cache
+    assert keys[1] not in cache
+
+
+def test_result_cache_memory():
+    cache = ResultCache(max_bytes=10**6)
+    frame = pd.DataFrame({"a": range(10)})
+    key = cache.key(frame, "pipeline")
+    assert key == cache.key(frame.copy(), "pipeline")
+    assert key != cache.key(frame, "other_pipeline")
+    assert cache.get(key) is None
+    assert cache.put(key, frame.assign(b=1), {"summary": 1})
+    transformed, results = cache.get(key)
+    assert transformed.equals(frame.assign(b=1))
+    assert results == {"summary": 1}
+
+
+def test_result_cache_directory(tmp_path):
+    cache = ResultCache(max_bytes=10**6, directory=tmp_path)
+    frame = pd.DataFrame({"a": range(10)})
+    key = cache.key(frame, "pipeline")
+    cache.put(key, frame, {})
+
+    other_process_cache = pickle.loads(pickle.dumps(cache))
+    assert len(other_process_cache) == 0
+    assert other_process_cache.get(key)[0].equals(frame)
+    assert len(other_process_cache) == 1
+
+    cache.clear()
+    assert other_process_cache.get(key) is not None
+    assert ResultCache(max_bytes=10**6, directory=tmp_path).get(key) is None
@@ -1,7 +1,14 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
 import pytest
 
 from data_steps import DataSteps
+from data_steps.cache import ResultCache
 
 
 @pytest.fixture
@@ -134,3 +141,881 @@ def test_step_with_args(raw_frame):
 
     data.update_step_kwargs("inc_col1", {"value": 20})
     assert data.transformed.Col4.unique()[0] == 20
+
+
+def test_prefix_cache_reuses_steps(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+    calls = {"add_col4": 0, "add_col5": 0}
+
+    @data.step
+    def add_col4(frame, value=1):
+        calls["add_col4"] += 1
+        return frame.assign(Col4=value)
+
+    @data.step(priority=10)
+    def add_col5(frame):
+        calls["add_col5"] += 1
+        return frame.assign(Col5="constant")
+
+    assert "Col4" in data.partial_transform(0)
+    assert "Col5" in data.transformed
+    assert calls == {"add_col4": 1, "add_col5": 1}
+
+    data.update_step_kwargs("add_col4", {"value": 2})
+    assert data.transformed.Col4.unique()[0] == 2
+    assert calls == {"add_col4": 2, "add_col5": 2}
+
+    data.update_step_kwargs("add_col4", {"value": 2})
+    data.transformed
+    assert calls == {"add_col4": 2, "add_col5": 2}
+
+
+def test_prefix_cache_array_kwargs_changed_in_place(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step
+    def weighted(frame, weights=None):
+        return frame.assign(Col4=frame["Col1"] * weights[4_000])
+
+    weights = np.zeros(5_000)
+    data.update_step_kwargs("weighted", {"weights": weights})
+    assert data.transformed.Col4.tolist() == [0] * 5
+    weights[4_000] = 7
+    data.update_step_kwargs("weighted", {"weights": weights})
+    assert data.transformed.Col4.tolist() == [7, 14, 21, 28, 35]
+
+
+def test_prefix_cache_series_result(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step
+    def col1(frame):
+        return frame["Col1"]
+
+    assert data.transformed.equals(raw_frame["Col1"])
+    assert data.transformed.equals(raw_frame["Col1"])
+
+
+def test_prefix_cache_redefined_step(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+    calls = []
+
+    @data.step
+    def add_col4(frame):
+        calls.append("add_col4")
+        return frame.assign(Col4="constant")
+
+    @data.step(priority=10)
+    def add_col5(frame):
+        calls.append("add_col5")
+        return frame.assign(Col5="constant")
+
+    data.transformed
+
+    @data.step(priority=10)  # noqa: F811
+    def add_col5(frame):
+        calls.append("add_col5")
+        return frame.assign(Col5="redefined")
+
+    assert data.transformed.Col5.unique()[0] == "redefined"
+    assert calls == ["add_col4", "add_col5", "add_col5"]
+
+    @data.step(priority=10, active=False)  # noqa: F811
+    def add_col5(frame):
+        ...
+
+    assert "Col5" not in data.transformed
+    assert calls == ["add_col4", "add_col5", "add_col5"]
+
+
+def test_prefix_cache_protects_cached_data(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step(has_secondary_result=True)
+    def add_col4(frame):
+        frame["Col4"] = 1
+        return frame, "result"
+
+    transformed = data.transformed
+    transformed["Col4"] = 2
+    assert data.transformed.Col4.unique()[0] == 1
+    assert data.secondary_results == {"add_col4": "result"}
+    assert "Col4" not in data.original
+
+
+def test_cached_data_copied_without_copy_on_write(raw_frame, monkeypatch):
+    monkeypatch.setattr("data_steps.single_frame._copy_on_write_enabled", lambda: False)
+    for options in [{"cache_max_bytes": 10**6}, {"result_cache": ResultCache(10**6)}]:
+        data = DataSteps(raw_frame, copy_original=False, **options)
+
+        @data.step(mutates_input=False)
+        def add_col4(frame):
+            return frame.assign(Col4=1)
+
+        transformed = data.transformed
+        transformed["Col4"] = 2
+        assert data.transformed is not transformed
+        assert data.transformed.Col4.tolist() == [1] * 5
+
+
+def test_prefix_cache_protects_secondary_results(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step(has_secondary_result=True)
+    def summ(frame):
+        return frame, frame.describe()
+
+    for run in [data.run, lambda: data.run(upto=0)]:
+        summary = run().secondary_results["summ"]
+        summary.iloc[0, 0] = -999
+        assert run().secondary_results["summ"].iloc[0, 0] == 5
+
+
+def test_prefix_cache_cleared_for_new_original(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    assert data.transformed.Col4.sum() == 30
+    data.set_original(raw_frame.assign(Col1=0))
+    assert data.transformed.Col4.sum() == 0
+
+
+def test_run_single_pass(raw_frame):
+    data = DataSteps(raw_frame)
+    calls = []
+
+    @data.step(has_secondary_result=True)
+    def add_col4(frame):
+        calls.append("add_col4")
+        return frame.assign(Col4="constant"), "result_1"
+
+    @data.step(priority=10)
+    def add_col5(frame):
+        calls.append("add_col5")
+        return frame.assign(Col5="constant")
+
+    result = data.run()
+    assert calls == ["add_col4", "add_col5"]
+    assert result.transformed.equals(data.transformed)
+    assert result.secondary_results == {"add_col4": "result_1"}
+    assert result.step_metadata["function_name"].tolist() == ["add_col4", "add_col5"]
+    assert result.step_metadata.index.name == "application_order"
+
+
+def test_run_upto(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step(has_secondary_result=True)
+    def add_col4(frame):
+        return frame.assign(Col4="constant"), "result_1"
+
+    @data.step(priority=10, has_secondary_result=True)
+    def add_col5(frame):
+        return frame.assign(Col5="constant"), "result_2"
+
+    result = data.run(upto=0)
+    assert "Col5" not in result.transformed
+    assert result.secondary_results == {"add_col4": "result_1"}
+    assert len(result.step_metadata) == 1
+
+    result = data.run(upto=-1)
+    assert result.transformed.equals(raw_frame)
+    assert result.step_metadata.empty
+
+
+def test_run_metadata_from_cache(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4="constant")
+
+    @data.step(priority=10)
+    def add_col5(frame):
+        return frame.assign(Col5="constant")
+
+    data.run(upto=0)
+    assert data.run().step_metadata["from_cache"].tolist() == [True, False]
+
+
+def test_copy_original_disabled(raw_frame):
+    data = DataSteps(raw_frame, copy_original=False)
+
+    @data.step
+    def set_col1(frame):
+        frame["Col1"] = 0
+        return frame
+
+    assert data.transformed.Col1.sum() == 0
+    assert data.original.equals(raw_frame)
+    assert data.original.Col1.sum() == 15
+
+
+def test_copy_original_disabled_without_copy_on_write(raw_frame, monkeypatch):
+    monkeypatch.setattr("data_steps.single_frame._copy_on_write_enabled", lambda: False)
+    data = DataSteps(raw_frame, copy_original=False)
+    inputs = []
+
+    @data.step(mutates_input=False)
+    def add_col4(frame):
+        inputs.append(frame)
+        return frame.assign(Col4=1)
+
+    @data.step(priority=10)
+    def set_col1(frame):
+        inputs.append(frame)
+        frame["Col1"] = 0
+        return frame
+
+    assert data.transformed.Col1.sum() == 0
+    assert inputs[0] is raw_frame
+    assert inputs[1] is not raw_frame
+    assert raw_frame.Col1.sum() == 15
+
+
+def test_check_mutation(raw_frame):
+    data = DataSteps(raw_frame, check_mutation=True)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4=1)
+
+    assert "Col4" in data.transformed
+
+    @data.step
+    def set_col1(frame):
+        frame["Col1"] = 0
+        return frame
+
+    with pytest.raises(RuntimeError) as exc_info:
+        data.transformed
+
+    assert "set_col1" in str(exc_info.value)
+
+
+def test_stream(raw_frame):
+    data = DataSteps()
+
+    @data.step(row_local=True)
+    def inc_col1(frame):
+        return frame.assign(Col1=lambda df: df["Col1"] + 1)
+
+    @data.step(priority=10, row_local=True, has_secondary_result=True)
+    def filter_col3(frame):
+        return frame.loc[frame["Col3"] > 0.05], "discarded"
+
+    chunks = [raw_frame.iloc[:2], raw_frame.iloc[2:4], raw_frame.iloc[4:]]
+    streamed = data.stream(iter(chunks))
+    assert not isinstance(streamed, pd.DataFrame)
+    result = pd.concat(list(streamed))
+    assert result.equals(data.set_original(raw_frame).transformed)
+    assert chunks[0].equals(raw_frame.iloc[:2])
+
+
+def test_stream_not_row_local(raw_frame):
+    data = DataSteps()
+
+    @data.step(row_local=True)
+    def inc_col1(frame):
+        return frame.assign(Col1=lambda df: df["Col1"] + 1)
+
+    @data.step
+    def sort_col1(frame):
+        return frame.sort_values("Col1")
+
+    with pytest.raises(ValueError) as exc_info:
+        data.stream([raw_frame])
+
+    assert "sort_col1" in str(exc_info.value)
+    assert "inc_col1" not in str(exc_info.value)
+
+
+def test_profile(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4="constant")
+
+    @data.step(priority=10)
+    def filter_col1(frame):
+        return frame.loc[frame["Col1"] > 2]
+
+    data.transformed
+    profile = data.profile()
+    assert profile["function_name"].tolist() == ["add_col4", "filter_col1"]
+    assert profile["calls"].tolist() == [1, 1]
+    assert (profile["wall_time"] >= 0).all()
+    assert profile["rows_in"].tolist() == [5, 5]
+    assert profile["rows_out"].tolist() == [5, 3]
+    assert profile["columns_out"].tolist() == [4, 4]
+
+    assert data.profile()["calls"].tolist() == [2, 2]
+    assert data.profile(reset=True)["calls"].tolist() == [1, 1]
+
+
+def test_run_profile_metadata(raw_frame):
+    data = DataSteps(raw_frame)
+    assert "wall_time" not in data.run().step_metadata
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4="constant")
+
+    assert "wall_time" not in data.run().step_metadata
+    assert data.run(profile=True).step_metadata["columns_in"].tolist() == [3]
+
+
+def test_memory_profile(raw_frame):
+    data = DataSteps(raw_frame)
+    assert data.memory_profile().empty
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col3"] * 2)
+
+    @data.step(priority=10)
+    def drop_col2(frame):
+        return frame.drop(columns="Col2")
+
+    memory_profile = data.memory_profile()
+    assert memory_profile["function_name"].tolist() == ["add_col4", "drop_col2"]
+    assert memory_profile["bytes_delta"].tolist()[0] > 0
+    assert memory_profile["bytes_delta"].tolist()[1] < 0
+    assert list(memory_profile["largest_column_growth"].tolist()[0]) == ["Col4"]
+    assert memory_profile["largest_column_growth"].tolist()[1] == {}
+    assert (memory_profile["peak_bytes"] >= 0).all()
+
+
+def test_run_threads(raw_frame):
+    data = DataSteps(raw_frame)
+    # Both steps only pass the barrier if they are executed concurrently
+    barriers = [threading.Barrier(2, timeout=5)]
+
+    @data.step(priority=1, reads=["Col1"], writes=["Col4"])
+    def add_col4(frame):
+        for barrier in barriers:
+            barrier.wait()
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2, reads=["Col3"], writes=["Col5"], has_secondary_result=True)
+    def add_col5(frame):
+        for barrier in barriers:
+            barrier.wait()
+        return frame.assign(Col5=frame["Col3"] + 1), "result"
+
+    @data.step(priority=3, reads=["Col4", "Col5"], writes=["Col1"])
+    def set_col1(frame):
+        return frame.assign(Col1=frame["Col4"] + frame["Col5"])
+
+    result = data.run(threads=2)
+    barriers.clear()
+    expected = data.run()
+    assert result.transformed.equals(expected.transformed)
+    assert result.secondary_results == {"add_col5": "result"}
+    assert list(result.transformed.columns) == ["Col1", "Col2", "Col3", "Col4", "Col5"]
+    assert data.original.equals(raw_frame)
+
+
+def test_run_threads_cache(raw_frame):
+    data = DataSteps(raw_frame, cache_max_bytes=10**6, threads=2)
+
+    @data.step(priority=1, reads=["Col1"], writes=["Col4"])
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2, reads=["Col3"], writes=["Col5"])
+    def add_col5(frame):
+        return frame.assign(Col5=frame["Col3"] + 1)
+
+    transformed = data.transformed
+    assert data.run().step_metadata["from_cache"].tolist() == [True, True]
+    assert data.transformed.equals(transformed)
+
+
+def test_prune_columns(raw_frame):
+    data = DataSteps(raw_frame, prune_columns=True)
+
+    @data.step(reads=["Col1"], writes=["Col4"], row_local=True)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=10, reads=["Col4"], writes=["Col1"], row_local=True)
+    def set_col1(frame):
+        return frame.assign(Col1=frame["Col4"])
+
+    assert data.required_columns == ["Col1"]
+    assert list(data.transformed.columns) == ["Col1", "Col4"]
+    assert data.transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+    assert list(data.original.columns) == ["Col1", "Col2", "Col3"]
+
+    streamed = next(data.stream([raw_frame]))
+    assert streamed.equals(data.transformed)
+
+
+def test_prune_columns_undeclared(raw_frame):
+    data = DataSteps(raw_frame, prune_columns=True)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    with pytest.raises(ValueError):
+        data.transformed
+
+
+def test_apply(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step
+    def add_col4(frame, factor=2):
+        frame["Col4"] = frame["Col1"] * factor
+        return frame
+
+    other = raw_frame.assign(Col1=raw_frame["Col1"] * 10)
+    applied = data.apply(other)
+    assert applied.Col4.tolist() == [20, 40, 60, 80, 100]
+    assert "Col4" not in other
+    assert data(other).equals(applied)
+    assert data.original.equals(raw_frame)
+
+
+def test_apply_concurrent(raw_frame):
+    data = DataSteps(raw_frame)
+    started, release = threading.Event(), threading.Event()
+
+    @data.step
+    def add_col4(frame, factor=2):
+        started.set()
+        release.wait(timeout=5)
+        return frame.assign(Col4=frame["Col1"] * factor)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        running = executor.submit(data.apply, raw_frame)
+        started.wait(timeout=5)
+        data.update_step_kwargs("add_col4", {"factor": 3})
+        release.set()
+        after_update = executor.submit(data.apply, raw_frame)
+        assert running.result().Col4.tolist() == [2, 4, 6, 8, 10]
+        assert after_update.result().Col4.tolist() == [3, 6, 9, 12, 15]
+
+
+def test_arun(raw_frame):
+    data = DataSteps(raw_frame)
+    running = []
+
+    @data.step(priority=1, reads=["Col1"], writes=["Col4"])
+    async def add_col4(frame):
+        running.append("add_col4")
+        await asyncio.sleep(0.05)
+        assert "add_col5" in running
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2, reads=["Col1"], writes=["Col5"])
+    async def add_col5(frame):
+        running.append("add_col5")
+        await asyncio.sleep(0.05)
+        return frame.assign(Col5=frame["Col1"] * 3)
+
+    @data.step(priority=3, has_secondary_result=True)
+    def col_sum(frame):
+        return frame, frame["Col4"].sum() + frame["Col5"].sum()
+
+    result = asyncio.run(data.arun())
+    assert result.secondary_results == {"col_sum": 75}
+    assert list(result.transformed.columns) == ["Col1", "Col2", "Col3", "Col4", "Col5"]
+    assert data.original.equals(raw_frame)
+
+    other = asyncio.run(data.arun(raw_frame.assign(Col1=0)))
+    assert other.secondary_results == {"col_sum": 0}
+
+    assert data.transformed.equals(result.transformed)
+
+
+def test_observe_only(raw_frame):
+    data = DataSteps(raw_frame)
+    later_step_started = threading.Event()
+
+    @data.step(priority=1, has_secondary_result=True, observe_only=True)
+    def summary(frame):
+        frame["Col1"] = 0
+        return frame.assign(Col5=1), later_step_started.wait(timeout=5)
+
+    @data.step(priority=2)
+    def add_col4(frame):
+        later_step_started.set()
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    result = data.run()
+    assert result.secondary_results == {"summary": True}
+    assert list(result.transformed.columns) == ["Col1", "Col2", "Col3", "Col4"]
+    assert result.transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+    assert data.original.equals(raw_frame)
+    assert data.apply(raw_frame).equals(result.transformed)
+    assert ".pipe(summary" not in str(data.export("exported", without_data_steps=True))
+
+    profiled = data.run(profile=True)
+    assert profiled.transformed.equals(result.transformed)
+    assert profiled.secondary_results == {"summary": True}
+    assert asyncio.run(data.arun()).transformed.equals(result.transformed)
+
+
+def test_observe_only_not_awaited_for_data(raw_frame):
+    data = DataSteps(raw_frame)
+    release = threading.Event()
+
+    @data.step(priority=1, has_secondary_result=True, observe_only=True)
+    def diagnostics(frame):
+        release.wait(timeout=5)
+        return frame, len(frame)
+
+    @data.step(priority=2)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    start = time.perf_counter()
+    assert data.transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+    result = data.run()
+    assert time.perf_counter() - start < 2.5
+    release.set()
+    assert result.secondary_results == {"diagnostics": 5}
+    assert data.secondary_results == {"diagnostics": 5}
+
+
+def test_observe_only_requires_secondary_result(raw_frame):
+    data = DataSteps(raw_frame)
+
+    with pytest.raises(ValueError):
+
+        @data.step(observe_only=True)
+        def summary(frame):
+            return frame
+
+
+def test_append_original(raw_frame):
+    data = DataSteps(raw_frame.iloc[:3], cache_max_bytes=10**6)
+    processed_rows = []
+
+    @data.step(priority=1, row_local=True)
+    def add_col4(frame):
+        processed_rows.append(len(frame))
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2)
+    def cumulative_col4(frame):
+        return frame.assign(Col5=frame["Col4"].cumsum())
+
+    data.transformed
+    data.append_original(raw_frame.iloc[3:])
+    assert data.original.equals(raw_frame)
+    assert processed_rows == [3, 2]
+    assert data.transformed.Col5.tolist() == [2, 6, 12, 20, 30]
+
+
+def test_append_original_different_dtypes(raw_frame):
+    data = DataSteps(raw_frame.iloc[:3], cache_max_bytes=10**6)
+    processed_rows = []
+
+    @data.step(row_local=True)
+    def categorize_col2(frame):
+        processed_rows.append(len(frame))
+        return frame.assign(Col2=frame["Col2"].astype("category"))
+
+    data.transformed
+    data.append_original(raw_frame.iloc[3:])
+    expected = DataSteps(raw_frame)
+    expected.step(categorize_col2, row_local=True)
+    assert data.transformed.equals(expected.transformed)
+    assert data.transformed.Col2.dtype == "category"
+    assert processed_rows == [3, 2, 5, 5]
+
+
+def test_append_original_without_cache(raw_frame):
+    data = DataSteps(raw_frame.iloc[:3])
+
+    @data.step(row_local=True)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    assert data.append_original(raw_frame.iloc[3:]).transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+
+
+# Module level, as values of enclosing scopes are part of step fingerprints
+RESULT_CACHE_CALLS = []
+
+
+def test_result_cache(raw_frame):
+    result_cache = ResultCache(max_bytes=10**6)
+    calls = RESULT_CACHE_CALLS
+    calls.clear()
+
+    def build_pipeline(original):
+        data = DataSteps(original, result_cache=result_cache)
+
+        @data.step(has_secondary_result=True)
+        def add_col4(frame):
+            RESULT_CACHE_CALLS.append(len(frame))
+            return frame.assign(Col4=frame["Col1"] * 2), frame["Col1"].sum()
+
+        return data
+
+    first = build_pipeline(raw_frame).run()
+    second = build_pipeline(raw_frame.copy()).run()
+    assert calls == [5]
+    assert second.transformed.equals(first.transformed)
+    assert second.secondary_results == {"add_col4": 15}
+    assert second.step_metadata.from_cache.tolist() == [True]
+
+    second.transformed["Col4"] = 0
+    applied = build_pipeline(None).apply(raw_frame)
+    assert calls == [5]
+    assert applied.Col4.tolist() == [2, 4, 6, 8, 10]
+
+    build_pipeline(None).apply(raw_frame.iloc[:2])
+    assert calls == [5, 2]
+
+
+FACTOR = 2
+
+
+def test_result_cache_global_constants(raw_frame, monkeypatch):
+    result_cache = ResultCache(max_bytes=10**6)
+    data = DataSteps(raw_frame, result_cache=result_cache)
+
+    @data.step
+    def scale_col1(frame):
+        return frame.assign(Col4=frame["Col1"] * FACTOR)
+
+    assert data.transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+    monkeypatch.setitem(globals(), "FACTOR", 10)
+    assert data.transformed.Col4.tolist() == [10, 20, 30, 40, 50]
+    assert data.apply(raw_frame).Col4.tolist() == [10, 20, 30, 40, 50]
+
+
+def test_result_cache_protects_secondary_results(raw_frame):
+    data = DataSteps(raw_frame, result_cache=ResultCache(max_bytes=10**6))
+
+    @data.step(has_secondary_result=True)
+    def summ(frame):
+        return frame, frame.describe()
+
+    def transform_one():
+        ((_, result),) = data.transform_many([raw_frame], workers=1)
+        return result
+
+    for run in [data.run, lambda: data.run(threads=2), transform_one]:
+        summary = run().secondary_results["summ"]
+        summary.iloc[0, 0] = -999
+        assert run().secondary_results["summ"].iloc[0, 0] == 5
+
+
+def weighted_col1(frame, weights=None):
+    return frame["Col1"] + weights[5_000]
+
+
+def test_result_cache_large_kwargs_and_series(raw_frame):
+    result_cache = ResultCache(max_bytes=10**6)
+    weights = np.zeros(10_000)
+    changed = weights.copy()
+    changed[5_000] = 1
+    results = []
+    for values in [weights, changed]:
+        data = DataSteps(raw_frame, result_cache=result_cache)
+        data.step(weighted_col1)
+        data.update_step_kwargs("weighted_col1", {"weights": values})
+        results.append(data.transformed)
+    assert results[0].tolist() == [1, 2, 3, 4, 5]
+    assert results[1].tolist() == [2, 3, 4, 5, 6]
+    assert len(result_cache) == 2
+
+
+def test_sweep(raw_frame):
+    data = DataSteps(raw_frame)
+    prefix_calls = []
+
+    @data.step(priority=1)
+    def add_col4(frame):
+        prefix_calls.append(1)
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2, has_secondary_result=True)
+    def scale_col4(frame, factor=1, offset=0):
+        scaled = frame.assign(Col4=frame["Col4"] * factor + offset)
+        return scaled, scaled["Col4"].sum()
+
+    @data.step(priority=3)
+    def filter_col4(frame):
+        return frame.loc[frame["Col4"] > 10]
+
+    candidates = [{"factor": 2}, {"factor": 3, "offset": 1}]
+    results = data.sweep("scale_col4", candidates, workers=2)
+    assert prefix_calls == [1]
+    assert data._steps.plan[1].function_kwargs == {"factor": 1, "offset": 0}
+
+    for kwargs, result in zip(candidates, results):
+        data.update_step_kwargs("scale_col4", {"factor": 1, "offset": 0, **kwargs})
+        expected = data.run()
+        assert result.transformed.equals(expected.transformed)
+        assert result.secondary_results == expected.secondary_results
+        assert result.step_metadata.function_name.tolist() == [
+            "add_col4",
+            "scale_col4",
+            "filter_col4",
+        ]
+
+    scores = data.sweep("scale_col4", candidates, reduce=lambda result: len(result.transformed))
+    assert scores == [3, 4]
+
+    with pytest.raises(ValueError):
+        data.sweep("missing_step", candidates)
+    with pytest.raises(ValueError):
+        data.sweep("scale_col4", [{"unexpected": 1}])
+
+
+def test_preview():
+    original = pd.DataFrame({"Col1": range(400), "Col2": ["A"] * 300 + ["B"] * 100})
+    data = DataSteps(original)
+
+    @data.step(priority=1)
+    def add_col3(frame):
+        return frame.assign(Col3=frame["Col1"] * 2)
+
+    @data.step(priority=2, has_secondary_result=True)
+    def pairwise(frame):
+        time.sleep(len(frame) ** 2 * 4e-6)
+        return frame, frame["Col2"].value_counts().to_dict()
+
+    with pytest.warns(UserWarning, match="pairwise"):
+        result = data.preview(n=200, stratify="Col2")
+
+    assert len(result.transformed) == 200
+    assert result.transformed.index.is_monotonic_increasing
+    assert result.transformed.Col3.equals(result.transformed.Col1 * 2)
+    assert result.secondary_results == {"pairwise": {"A": 150, "B": 50}}
+    metadata = result.step_metadata.set_index("function_name")
+    assert metadata.loc["pairwise", "sample_rows_in"] == 200
+    assert metadata.loc["pairwise", "scaling_exponent"] > 1.5
+    assert metadata.loc["pairwise", "extrapolated_wall_time"] > 0.4
+
+    empty = DataSteps(original.iloc[:0])
+    empty.step(add_col3)
+    result = empty.preview()
+    assert result.transformed.columns.tolist() == ["Col1", "Col2", "Col3"]
+    assert result.step_metadata.sample_rows_in.tolist() == [0]
+    assert result.step_metadata.extrapolated_wall_time.notna().all()
+
+    repeated = data.preview(frac=0.5, sizes=1)
+    assert repeated.transformed.equals(data.preview(frac=0.5, sizes=1).transformed)
+    with pytest.raises(ValueError):
+        data.preview(frac=0.5, n=10)
+    with pytest.raises(ValueError):
+        data.preview(sizes=0)
+
+
+def test_step_number_priorities(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step(priority=np.int64(3))
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2.5)
+    def add_col5(frame):
+        return frame.assign(Col5=frame["Col1"] + 1)
+
+    @data.step(priority=1)
+    def add_col6(frame):
+        return frame.assign(Col6=frame["Col1"] - 1)
+
+    assert data.steps.function_name.tolist() == ["add_col6", "add_col5", "add_col4"]
+    assert data.steps.priority.tolist() == [1, 2.5, 3]
+    assert list(data.transformed.columns[-3:]) == ["Col6", "Col5", "Col4"]
+    with pytest.raises(ValueError):
+        data.step(add_col4, priority="3")
+
+
+def test_optimize_dtypes():
+    original = pd.DataFrame({"Col1": range(100), "Col2": ["A", "B"] * 50})
+    data = DataSteps(original)
+
+    @data.step(priority=3)
+    def add_col3(frame):
+        return frame.assign(Col3=frame["Col1"] * 2)
+
+    @data.step(priority=5)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col3"] + 1)
+
+    data.optimize_dtypes(strings=None)
+    assert data.steps.function_name.tolist() == ["add_col3", "optimize_dtypes", "add_col4"]
+    assert data.steps.priority.tolist() == [3, 3, 5]
+    assert data.steps.priority.dtype == "int64"
+    with pytest.raises(ValueError):
+        data.step(add_col4, priority=None)
+
+    result = data.run()
+    assert result.transformed.Col1.dtype == "int8"
+    assert result.transformed.Col2.dtype == original.Col2.dtype
+    assert result.transformed.Col4.tolist() == list(range(1, 200, 2))
+    report = result.secondary_results["optimize_dtypes"]
+    assert list(report.index) == ["Col1", "Col3"]
+    metadata = result.step_metadata.set_index("function_name")
+    assert metadata.loc["optimize_dtypes", "bytes_saved"] == report.bytes_saved.sum()
+    assert pd.isna(metadata.loc["add_col3", "bytes_saved"])
+    assert original.Col1.dtype == "int64"
+
+    data.optimize_dtypes(priority=10)
+    assert data.steps.function_name.tolist() == ["add_col3", "add_col4", "optimize_dtypes"]
+    assert data.transformed.Col2.dtype == "category"
+    assert "bytes_saved" in data.memory_profile()
+
+
+def test_non_frame_originals(raw_frame):
+    data = DataSteps(raw_frame.Col1)
+
+    @data.step
+    def double(values):
+        return values * 2
+
+    assert data.original.equals(raw_frame.Col1)
+    assert data.transformed.equals(raw_frame.Col1 * 2)
+    assert data.apply(raw_frame.Col3).equals(raw_frame.Col3 * 2)
+
+    array = np.arange(3)
+    assert (data.set_original(array).transformed == array * 2).all()
+
+
+def test_arrow_input_and_output(raw_frame):
+    pa = pytest.importorskip("pyarrow")
+    table = pa.Table.from_pandas(raw_frame)
+    data = DataSteps(table, output="arrow")
+    assert isinstance(data.original.dtypes["Col1"], pd.ArrowDtype)
+
+    @data.step
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    transformed = data.transformed
+    assert isinstance(transformed, pa.Table)
+    assert transformed.column("Col4").to_pylist() == [2, 4, 6, 8, 10]
+    assert transformed.column("Col1").chunks[0].buffers()[1].address == (
+        table.column("Col1").chunks[0].buffers()[1].address
+    )
+    assert isinstance(data.run().transformed, pa.Table)
+    assert isinstance(data.partial_transform(-1), pa.Table)
+    assert data.apply(table.slice(0, 2)).column("Col4").to_pylist() == [2, 4]
+    assert data(raw_frame).num_rows == 5
+    assert isinstance(asyncio.run(data.arun(table)).transformed, pa.Table)
+
+    data.set_original(table.slice(1, 2))
+    assert data.transformed.column("Col4").to_pylist() == [4, 6]
+
+    pandas_data = DataSteps(table)
+    pandas_data.step(add_col4)
+    assert isinstance(pandas_data.transformed, pd.DataFrame)
+    assert pandas_data.transformed.Col4.tolist() == [2, 4, 6, 8, 10]
+    with pytest.raises(ValueError):
+        DataSteps(raw_frame, output="numpy")
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_steps.dtypes import REPORT_COLUMNS, optimize_dtypes
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+@pytest.fixture
+def wide_frame():
+    return pd.DataFrame(
+        {
+            "small": np.arange(100),
+            "large": np.arange(100) * 2**40,
+            "unsigned": np.arange(100, dtype="uint64"),
+            "nullable": pd.array([1, None] * 50, dtype="Int64"),
+            "halves": np.arange(100) / 2,
+            "tenths": np.arange(100) / 10,
+            "labels": ["a", "b"] * 50,
+            "names": [f"name_{n}" for n in range(100)],
+            "flags": [True, False] * 50,
+        }
+    )
+
+
+def test_optimize_dtypes(wide_frame):
+    optimized, report = optimize_dtypes(wide_frame)
+    assert optimized.dtypes.astype(str).to_dict() == {
+        "small": "int8",
+        "large": "int64",
+        "unsigned": "uint8",
+        "nullable": "Int8",
+        "halves": "float32",
+        "tenths": "float64",
+        "labels": "category",
+        "names": str(wide_frame["names"].dtype),
+        "flags": "bool",
+    }
+    assert list(report.columns) == REPORT_COLUMNS
+    assert list(report.index) == ["small", "unsigned", "nullable", "halves", "labels"]
+    assert (report.bytes_saved > 0).all()
+    assert (report.bytes_saved == report.bytes_before - report.bytes_after).all()
+    for column in wide_frame:
+        assert optimized[column].astype(wide_frame[column].dtype).equals(wide_frame[column])
+    assert wide_frame["small"].dtype == "int64"
+
+
+def test_optimize_dtypes_rules(wide_frame):
+    optimized, report = optimize_dtypes(
+        wide_frame, floats=False, strings=None, exclude=["small"]
+    )
+    assert list(report.index) == ["unsigned", "nullable"]
+    assert optimized["halves"].dtype == "float64"
+
+    _, report = optimize_dtypes(wide_frame, max_category_ratio=0.01)
+    assert "labels" not in report.index
+
+    with pytest.raises(ValueError):
+        optimize_dtypes(wide_frame, strings="text")
+
+
+def test_optimize_dtypes_arrow_strings():
+    pytest.importorskip("pyarrow")
+    frame = pd.DataFrame(
+        {
+            "names": pd.Series([f"name_{n}" for n in range(100)], dtype=object),
+            "missing": pd.Series(["a", None] * 50, dtype=object),
+        }
+    )
+    optimized, report = optimize_dtypes(frame, strings="arrow")
+    assert list(report.index) == ["names"]
+    assert optimized["names"].tolist() == frame["names"].tolist()
+    # None would become a different missing value
+    assert optimized["missing"].dtype == object
+
+
+def test_optimize_dtypes_unchanged(raw_frame):
+    optimized, report = optimize_dtypes(raw_frame, floats=False, strings=None)
+    assert optimized["Col1"].dtype == "int8"
+    assert report.loc["Col1", "dtype_before"] == "int64"
+
+    _, report = optimize_dtypes(raw_frame.loc[:, ["Col2", "Col3"]])
+    assert report.empty
+    assert list(report.columns) == REPORT_COLUMNS
+
+    with pytest.raises(ValueError):
+        optimize_dtypes(pd.concat([raw_frame, raw_frame], axis=1))
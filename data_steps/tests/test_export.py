@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 
 import pandas as pd
@@ -95,7 +96,7 @@ def test_step_to_pipe_secondary_results():
     step = Step(priority=1, function=sample_function, has_secondary_result=True)
     assert (
         DataStepsStringExport._step_to_pipe(step)
-        == ".pipe(lambda x: sample_function(x)[0],**{'a': 20})"
+        == ".pipe(lambda x: sample_function(x, **{'a': 20})[0])"
     )
 
 
@@ -192,3 +193,50 @@ def test_export_equivalence_two_transforms(raw_frame):
     assert_independent_reimport(
         data, data.export("my_transformation", without_data_steps=True), "my_transformation"
     )
+
+
+def test_export_equivalence_async_steps(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step
+    async def inc_col1(frame, a=10):
+        return frame.assign(Col1=lambda df: df["Col1"] + a)
+
+    @data.step(priority=6, has_secondary_result=True)
+    def create_col4(frame):
+        return frame.assign(Col4=lambda df: df["Col1"] * df["Col3"]), "secondary_value"
+
+    removed_dec = DataStepsStringExport._remove_decorator(inspect.getsource(inc_col1))
+    assert removed_dec.strip().startswith("async def")
+
+    assert_reimport(data, data.export("reimport"), "reimport")
+    export = data.export("my_async_transformation", without_data_steps=True)
+    exec(str(export), globals())
+    result = asyncio.run(globals()["my_async_transformation"](data.original))
+    assert result.equals(data.transformed)
+
+
+def test_export_equivalence_library_steps(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step(priority=3)
+    def inc_col1(frame, a=10):
+        return frame.assign(Col1=lambda df: df["Col1"] + a)
+
+    @data.step(priority=5, has_secondary_result=True)
+    def create_col4(frame, factor=2):
+        return frame.assign(Col4=lambda df: df["Col1"] * factor), "secondary_value"
+
+    data.optimize_dtypes(strings=None)
+
+    export = str(data.export("reimport"))
+    assert "def optimize_dtypes" not in export
+    assert_reimport(data, export, "reimport")
+    assert_independent_reimport(
+        data, data.export("my_transformation", without_data_steps=True), "my_transformation"
+    )
+
+    data.optimize_dtypes(priority=10)
+    _locals = {}
+    exec(str(data.export("reimport")), globals(), _locals)
+    assert _locals["reimport"].steps.equals(data.steps)
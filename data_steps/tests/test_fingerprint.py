@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from data_steps.fingerprint import (
+    content_fingerprint,
+    data_fingerprint,
+    prefix_fingerprints,
+    step_fingerprint,
+)
+from data_steps.single_frame import Step
+
+
+def test_data_fingerprint_frame():
+    frame = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert data_fingerprint(frame) == data_fingerprint(frame.copy())
+    assert data_fingerprint(frame) != data_fingerprint(frame.assign(a=[1, 2, 4]))
+    assert data_fingerprint(frame) != data_fingerprint(frame.astype({"a": float}))
+    assert data_fingerprint(frame) != data_fingerprint(frame.rename(columns={"a": "c"}))
+
+
+def test_data_fingerprint_unhashable_values():
+    frame = pd.DataFrame({"a": [[1], [2]]})
+    assert data_fingerprint(frame) == data_fingerprint(frame.copy())
+    assert data_fingerprint(frame) != data_fingerprint(pd.DataFrame({"a": [[1], [3]]}))
+
+
+def test_step_fingerprint_kwargs():
+    def sample_function(dummy, a=10):
+        ...
+
+    step = Step(priority=1, function=sample_function)
+    fingerprint = step_fingerprint(step)
+    assert step_fingerprint(Step(priority=2, function=sample_function)) == fingerprint
+    step.update_function_kwargs({"a": 20})
+    assert step_fingerprint(step) != fingerprint
+
+
+def test_step_fingerprint_large_array_kwargs():
+    def sample_function(dummy, weights=None):
+        ...
+
+    weights = np.zeros(10_000)
+    changed = weights.copy()
+    changed[5_000] = 1
+    step = Step(priority=1, function=sample_function)
+    step.update_function_kwargs({"weights": weights})
+    fingerprint = step_fingerprint(step)
+    step.update_function_kwargs({"weights": weights.copy()})
+    assert step_fingerprint(step) == fingerprint
+    for value in [changed, [changed], {"weights": changed}, pd.Index(changed)]:
+        step.update_function_kwargs({"weights": value})
+        assert step_fingerprint(step) != fingerprint
+
+
+def test_step_fingerprint_closure():
+    def make_function(increment):
+        def sample_function(dummy):
+            return dummy + increment
+
+        return sample_function
+
+    assert step_fingerprint(Step(priority=1, function=make_function(1))) != step_fingerprint(
+        Step(priority=1, function=make_function(2))
+    )
+
+
+THRESHOLD = 1
+
+
+def test_step_fingerprint_globals(monkeypatch):
+    def sample_function(dummy):
+        return dummy.assign(a=lambda df: df["a"] + THRESHOLD)
+
+    def helper_function(dummy):
+        return sample_function(pd.DataFrame(dummy))
+
+    fingerprint = step_fingerprint(Step(priority=1, function=sample_function))
+    helper_fingerprint = step_fingerprint(Step(priority=1, function=helper_function))
+    monkeypatch.setitem(globals(), "THRESHOLD", 3)
+    assert step_fingerprint(Step(priority=1, function=sample_function)) != fingerprint
+    # Globals of called functions are not covered
+    assert step_fingerprint(Step(priority=1, function=helper_function)) == helper_fingerprint
+
+
+COUNTERS = {"calls": 0}
+
+
+def test_step_fingerprint_mutable_globals():
+    def sample_function(dummy):
+        COUNTERS["calls"] += 1
+        return dummy
+
+    fingerprint = step_fingerprint(Step(priority=1, function=sample_function))
+    sample_function(None)
+    assert step_fingerprint(Step(priority=1, function=sample_function)) == fingerprint
+
+
+def test_step_fingerprint_options():
+    def sample_function(dummy):
+        return dummy, None
+
+    fingerprint = step_fingerprint(Step(1, sample_function, has_secondary_result=True))
+    observing = Step(1, sample_function, has_secondary_result=True, observe_only=True)
+    assert step_fingerprint(observing) != fingerprint
+    reading = Step(1, sample_function, has_secondary_result=True, reads=["a"])
+    assert step_fingerprint(reading) != fingerprint
+
+
+def test_prefix_fingerprints():
+    def first(dummy, a=10):
+        ...
+
+    def second(dummy):
+        ...
+
+    steps = [Step(priority=1, function=first), Step(priority=2, function=second)]
+    fingerprints = prefix_fingerprints(steps)
+    assert prefix_fingerprints(steps[:1]) == fingerprints[:1]
+
+    steps[0].update_function_kwargs({"a": 20})
+    new_fingerprints = prefix_fingerprints(steps)
+    assert new_fingerprints[0] != fingerprints[0]
+    assert new_fingerprints[1] != fingerprints[1]
+
+
+def test_content_fingerprint_sampled():
+    frame = pd.DataFrame({"a": range(1000)})
+    assert content_fingerprint(frame) == data_fingerprint(frame)
+    assert content_fingerprint(frame, sample_rows=2000) == data_fingerprint(frame)
+
+    sampled = content_fingerprint(frame, sample_rows=80)
+    assert sampled == content_fingerprint(frame.copy(), sample_rows=80)
+    assert sampled != content_fingerprint(frame.iloc[:-1], sample_rows=80)
+    assert sampled != content_fingerprint(frame.assign(a=frame["a"] + 1), sample_rows=80)
@@ -0,0 +1,160 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from data_steps import DataSteps
+from data_steps.history import RunHistory, performance_report
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+def make_run(*steps):
+    return {
+        "started": "2021-01-01T00:00:00+00:00",
+        "duration": sum(wall_time for _, _, wall_time, _ in steps),
+        "error": None,
+        "steps": [
+            {
+                "function_name": name,
+                "fingerprint": fingerprint,
+                "wall_time": wall_time,
+                "rows_in": rows_in,
+                "columns_in": 3,
+            }
+            for name, fingerprint, wall_time, rows_in in steps
+        ],
+    }
+
+
+def test_performance_report_normalised_by_rows():
+    runs = [
+        make_run(("load", "a", 1.0, 100), ("aggregate", "b", 1.0, 100)),
+        make_run(("load", "a", 2.0, 200), ("aggregate", "b", 2.0, 200)),
+        make_run(("load", "c", 1.0, 100), ("aggregate", "b", 4.0, 100)),
+    ]
+    report = performance_report(runs, threshold=1.5)
+    assert report.function_name.tolist() == ["load", "aggregate"]
+    assert report.ratio.tolist() == [1.0, 4.0]
+    assert report.regression.tolist() == [False, True]
+    assert report.fingerprint_changed.tolist() == [True, False]
+    assert report.likely_cause.isna().tolist() == [True, False]
+    assert report.loc[1, "likely_cause"] == "load"
+
+
+def test_performance_report_ignores_failed_runs():
+    runs = [make_run(("load", "a", 1.0, 100)), {**make_run(("load", "a", 9.0, 100)), "error": "E"}]
+    report = performance_report(runs)
+    assert report.wall_time.tolist() == [1.0]
+    assert not report.regression.any()
+    assert performance_report([]).empty
+
+
+def test_run_history(raw_frame, tmp_path):
+    path = tmp_path / "history.jsonl"
+    data = DataSteps(raw_frame, history_path=path)
+
+    @data.step(priority=1)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2)
+    def slow_step(frame, delay=0.0):
+        time.sleep(delay)
+        return frame
+
+    for _ in range(3):
+        data.transformed
+    data.update_step_kwargs("slow_step", {"delay": 0.05})
+    data.transformed
+
+    runs = RunHistory(path).runs()
+    assert len(runs) == 4
+    assert [step["function_name"] for step in runs[0]["steps"]] == ["add_col4", "slow_step"]
+    assert runs[0]["steps"][1]["rows_in"] == 5
+    assert json.loads(path.read_text().splitlines()[-1])["error"] is None
+
+    report = data.performance_report().set_index("function_name")
+    assert report.loc["slow_step", "regression"]
+    assert report.loc["slow_step", "fingerprint_changed"]
+    assert report.loc["slow_step", "likely_cause"] == "slow_step"
+    assert not report.loc["add_col4", "fingerprint_changed"]
+
+
+def test_performance_report_without_history(raw_frame):
+    with pytest.raises(ValueError):
+        DataSteps(raw_frame).performance_report()
+
+
+def test_run_history_skips_partial_and_profiled_runs(raw_frame, tmp_path):
+    path = tmp_path / "history.jsonl"
+    data = DataSteps(raw_frame, history_path=path)
+
+    @data.step(priority=1)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2)
+    def add_col5(frame):
+        return frame.assign(Col5=frame["Col1"] + 1)
+
+    data.transformed
+    data.partial_transform(0)
+    data.profile()
+    data.memory_profile()
+    data.run(upto=0)
+
+    assert len(RunHistory(path).runs()) == 1
+
+
+def test_run_history_concurrent_calls(raw_frame, tmp_path):
+    path = tmp_path / "history.jsonl"
+    data = DataSteps(raw_frame, history_path=path)
+
+    @data.step(priority=1)
+    def add_col4(frame):
+        time.sleep(0.01)
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2)
+    def add_col5(frame):
+        time.sleep(0.01)
+        return frame.assign(Col5=frame["Col1"] + 1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(data.apply, [raw_frame] * 8))
+
+    runs = RunHistory(path).runs()
+    assert len(runs) == 8
+    for run in runs:
+        assert [step["function_name"] for step in run["steps"]] == ["add_col4", "add_col5"]
+
+
+def test_run_history_steps_in_other_threads(raw_frame, tmp_path):
+    path = tmp_path / "history.jsonl"
+    data = DataSteps(raw_frame, history_path=path)
+
+    @data.step(priority=1, reads=["Col1"], writes=["Col4"])
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2, reads=["Col3"], writes=["Col5"])
+    def add_col5(frame):
+        return frame.assign(Col5=frame["Col3"] + 1)
+
+    data.run(threads=2)
+
+    runs = RunHistory(path).runs()
+    assert len(runs) == 1
+    assert sorted(step["function_name"] for step in runs[0]["steps"]) == ["add_col4", "add_col5"]
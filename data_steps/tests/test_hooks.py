@@ -0,0 +1,113 @@
+import pandas as pd
+import pytest
+
+from data_steps import DataSteps
+from data_steps.hooks import HistogramCollector, Hooks, register_hooks, unregister_hooks
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+class RecordingHooks(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_pipeline_start(self, pipeline):
+        self.events.append(("pipeline_start",))
+
+    def on_step_start(self, pipeline, step):
+        self.events.append(("step_start", step.name))
+
+    def on_step_end(self, pipeline, step, event):
+        self.events.append(("step_end", event))
+
+    def on_pipeline_end(self, pipeline, event):
+        self.events.append(("pipeline_end", event))
+
+
+def build_pipeline(raw_frame, **kwargs):
+    data = DataSteps(raw_frame, **kwargs)
+
+    @data.step(priority=1)
+    def add_col4(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    @data.step(priority=2)
+    def filter_col4(frame):
+        if frame["Col4"].isna().any():
+            raise ValueError("Missing values")
+        return frame.loc[frame["Col4"] > 4]
+
+    return data
+
+
+def test_instance_hooks(raw_frame):
+    hooks = RecordingHooks()
+    data = build_pipeline(raw_frame, hooks=[hooks])
+    data.transformed
+
+    names = [event[0] for event in hooks.events]
+    assert names == [
+        "pipeline_start",
+        "step_start",
+        "step_end",
+        "step_start",
+        "step_end",
+        "pipeline_end",
+    ]
+    filter_event = hooks.events[4][1]
+    assert filter_event.step_name == "filter_col4"
+    assert (filter_event.rows_in, filter_event.columns_in) == (5, 4)
+    assert (filter_event.rows_out, filter_event.columns_out) == (3, 4)
+    assert filter_event.duration >= 0
+    assert filter_event.exception is None
+    assert hooks.events[5][1].exception is None
+
+    data.remove_hooks(hooks)
+    data.apply(raw_frame)
+    assert len(hooks.events) == 6
+
+
+def test_hooks_exception(raw_frame):
+    hooks = RecordingHooks()
+    data = build_pipeline(raw_frame)
+    data.add_hooks(hooks)
+
+    with pytest.raises(ValueError):
+        data.apply(raw_frame.assign(Col1=None))
+    step_end, pipeline_end = hooks.events[-2:]
+    assert isinstance(step_end[1].exception, ValueError)
+    assert step_end[1].rows_out is None
+    assert isinstance(pipeline_end[1].exception, ValueError)
+
+
+def test_global_hooks(raw_frame):
+    collector = HistogramCollector()
+    register_hooks(collector)
+    try:
+        data = build_pipeline(raw_frame)
+        for _ in range(3):
+            data.apply(raw_frame)
+        data.transformed
+    finally:
+        unregister_hooks(collector)
+    data.transformed
+
+    summary = collector.summary()
+    assert summary.loc["add_col4", "count"] == 4
+    assert summary.loc["filter_col4", "rows_in"] == 20
+    assert summary.loc["add_col4", "errors"] == 0
+    assert summary.loc["add_col4", "p50_time"] <= summary.loc["add_col4", "p99_time"]
+    assert summary.loc["add_col4", "max_time"] <= summary.loc["add_col4", "p99_time"]
+    assert collector.histogram("add_col4").sum() == 4
+
+    collector.reset()
+    assert collector.summary().empty
@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+from data_steps import DataSteps
+from data_steps.lint import RULES, _str_is_object, lint_function
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+def rules(function):
+    return [rule for rule, _ in lint_function(function)]
+
+
+def test_lint_apply_axis_1():
+    def row_sum(frame):
+        return frame.assign(Col4=frame.apply(lambda row: row["Col1"] + row["Col3"], axis=1))
+
+    def column_sum(frame):
+        return frame.apply(sum, axis=0)
+
+    assert rules(row_sum) == ["apply_axis_1"]
+    assert rules(column_sum) == []
+
+
+def test_lint_loops():
+    def loops(frame):
+        parts = pd.DataFrame()
+        for _, row in frame.iterrows():
+            parts = pd.concat([parts, row.to_frame().T])
+        return pd.concat([parts, frame])
+
+    assert rules(loops) == ["row_iteration", "concat_in_loop"]
+
+
+def test_lint_chained_assignment():
+    def chained(frame):
+        frame["Col1"][0] = 1
+        frame.loc[0]["Col1"] = 2
+        frame["Col1"].loc[0] = 3
+        frame.loc[0, "Col1"] = 4
+        frame["Col4"] = 5
+        return frame
+
+    assert rules(chained) == ["chained_assignment"] * 3
+
+
+def test_lint_object_strings_and_copy():
+    def conversions(frame):
+        frame = frame.copy()
+        return frame.assign(Col2=frame["Col2"].astype(str), Col5=pd.Series(dtype="object"))
+
+    # astype(str) only gives object dtype before pandas 3 or without infer_string
+    expected = ["copy", "object_strings"] + ["object_strings"] * _str_is_object()
+    assert sorted(rules(conversions)) == expected
+
+
+def test_lint_object_string_ops():
+    def string_ops(frame):
+        frame["Col2"] = frame["Col2"].astype("object")
+        upper = frame["Col2"].str.upper()
+        return frame.assign(Col4=upper, Col5=frame["Col1"].astype("string").str.len())
+
+    assert rules(string_ops) == ["object_strings", "object_string_ops"]
+
+
+def test_lint_copy_of_frames_only():
+    def copies(frame):
+        names = frame.columns.tolist().copy()
+        options = {"a": 1}.copy()
+        subset = frame[names].copy()
+        return subset.assign(Col4=frame["Col1"].values.copy(), **options)
+
+    assert rules(copies) == ["copy"]
+
+
+def test_lint_line_numbers():
+    def copying(frame):
+        return frame.copy()
+
+    ((rule, line),) = lint_function(copying)
+    assert line == copying.__code__.co_firstlineno + 1
+
+
+def test_lint_steps(raw_frame):
+    data = DataSteps(raw_frame)
+
+    @data.step(priority=2)
+    def copying(frame):
+        return frame.copy()
+
+    @data.step(priority=1)
+    def clean(frame):
+        return frame.assign(Col4=frame["Col1"] * 2)
+
+    exec("def generated(frame):\n    return frame.copy()", globals())
+    data.step(globals()["generated"], priority=3)
+
+    report = data.lint()
+    assert report.index.equals(data.steps.index)
+    assert report.function_name.tolist() == ["clean", "copying", "generated"]
+    assert report["copy"].tolist()[:2] == [0, 1]
+    assert pd.isna(report.loc[2, "copy"])
+    assert report.loc[2, "messages"] == ["source not available"]
+    assert report.loc[1, "messages"][0].endswith(RULES["copy"])
+
+
+def test_lint_skips_library_steps(raw_frame):
+    data = DataSteps(raw_frame).optimize_dtypes()
+    report = data.lint()
+    assert report["copy"].tolist() == [0]
+    assert report.messages.tolist() == [[]]
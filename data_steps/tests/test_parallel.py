@@ -0,0 +1,197 @@
+import warnings
+
+import pandas as pd
+import pytest
+
+from data_steps import DataSteps
+
+pa = pytest.importorskip("pyarrow")
+
+from data_steps.arrow import (  # noqa: E402
+    ArrowRoundTripError,
+    read_shared_memory,
+    release_shared_memory,
+    to_shared_memory,
+)
+from data_steps.parallel import concat_partitions, transform_partitions  # noqa: E402
+from data_steps.single_frame import Step  # noqa: E402
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": range(100),
+            "Col2": ["A", "B", "C", "D"] * 25,
+            "Col3": [0.5] * 100,
+        },
+        index=pd.RangeIndex(100, 200, name="row"),
+    )
+
+
+def inc_col1(frame, value=1):
+    return frame.assign(Col1=frame["Col1"] + value)
+
+
+def filter_col2(frame):
+    return frame.loc[frame["Col2"] != "B"]
+
+
+def set_col3(frame):
+    frame.loc[:, "Col3"] = frame["Col1"] * 2.0
+    return frame
+
+
+def rank_col1(frame):
+    return frame.assign(Col4=frame["Col1"].rank())
+
+
+def categorize_col2(frame):
+    return frame.assign(Col2=frame["Col2"].astype("category"))
+
+
+def test_shared_memory_roundtrip(raw_frame):
+    handle = to_shared_memory(raw_frame)
+    try:
+        assert read_shared_memory(handle).equals(raw_frame)
+    finally:
+        release_shared_memory(handle)
+
+
+def test_shared_memory_outlives_release(raw_frame):
+    frame = raw_frame.astype({"Col1": pd.ArrowDtype(pa.int64())})
+    handle = to_shared_memory(frame)
+    result = read_shared_memory(handle)
+    release_shared_memory(handle)
+    assert result.equals(frame)
+
+
+def test_concat_partitions(raw_frame):
+    parts = [categorize_col2(raw_frame.iloc[:2]), categorize_col2(raw_frame.iloc[2:])]
+    result = concat_partitions(parts)
+    assert result.equals(categorize_col2(raw_frame))
+
+    parts = [raw_frame.iloc[:2], raw_frame.iloc[2:].astype({"Col1": float})]
+    with pytest.warns(UserWarning, match="Col1"):
+        concat_partitions(parts)
+
+
+def test_transform_partitions(raw_frame):
+    steps = [Step(priority=1, function=inc_col1), Step(priority=2, function=filter_col2)]
+    steps[0].update_function_kwargs({"value": 10})
+    expected = raw_frame.pipe(inc_col1, value=10).pipe(filter_col2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = transform_partitions(raw_frame, steps, workers=2, partitions=3)
+    assert result.equals(expected)
+
+
+def test_transformed_parallel(raw_frame):
+    data = DataSteps(raw_frame)
+    data.step(inc_col1, priority=1, row_local=True)
+    data.step(set_col3, priority=2, row_local=True)
+    data.step(filter_col2, priority=3, row_local=True)
+    data.step(rank_col1, priority=4)
+
+    assert data.transformed_parallel(workers=2, partitions=4).equals(data.transformed)
+    assert data.transformed_parallel(workers=2, partitions=1000).equals(data.transformed)
+    assert data.original.equals(raw_frame)
+
+
+def observe_col1(frame):
+    return frame.assign(junk=1), frame["Col1"].sum()
+
+
+def test_transformed_parallel_observe_only(raw_frame):
+    data = DataSteps(raw_frame)
+    data.step(inc_col1, priority=1, row_local=True)
+    data.step(observe_col1, priority=2, has_secondary_result=True, observe_only=True)
+    data.step(rank_col1, priority=3)
+
+    result = data.transformed_parallel(workers=2, partitions=4)
+    assert "junk" not in result
+    assert result.equals(data.transformed)
+
+
+def test_transformed_parallel_categories(raw_frame):
+    data = DataSteps(raw_frame)
+    data.step(filter_col2, priority=1, row_local=True)
+    data.step(categorize_col2, priority=2, row_local=True)
+
+    # Partitions of two rows only contain some of the categories
+    assert data.transformed_parallel(workers=2, partitions=50).equals(data.transformed)
+
+
+def test_transformed_parallel_without_row_local_steps(raw_frame):
+    data = DataSteps(raw_frame)
+    data.step(rank_col1)
+    assert data.transformed_parallel(workers=2).equals(data.transformed)
+
+
+def optional_values(index):
+    return pd.Series([None if n % 2 else n for n in range(len(index))], index, dtype=object)
+
+
+def add_optional_col4(frame):
+    return frame.assign(Col4=optional_values(frame.index))
+
+
+def test_transformed_parallel_arrow_changes(raw_frame):
+    for original in [
+        raw_frame.assign(Col4=optional_values(raw_frame.index)),
+        raw_frame.set_index(pd.date_range("2024-01-01", periods=len(raw_frame), freq="D")),
+    ]:
+        with pytest.raises(ArrowRoundTripError):
+            transform_partitions(original, [Step(1, inc_col1)], workers=2)
+        data = DataSteps(original)
+        data.step(inc_col1, row_local=True)
+        with pytest.warns(UserWarning, match="current process"):
+            result = data.transformed_parallel(workers=2)
+        pd.testing.assert_frame_equal(result, data.transformed)
+
+    data = DataSteps(raw_frame)
+    data.step(add_optional_col4, row_local=True)
+    with pytest.warns(UserWarning, match="current process"):
+        result = data.transformed_parallel(workers=2)
+    pd.testing.assert_frame_equal(result, data.transformed)
+
+
+def col1_sum(frame):
+    return frame, frame["Col1"].sum()
+
+
+def test_transform_many(raw_frame, tmp_path):
+    data = DataSteps()
+    data.step(inc_col1, priority=1)
+    data.step(col1_sum, priority=2, has_secondary_result=True)
+    data.step(filter_col2, priority=3)
+
+    path = tmp_path / "frame.pkl"
+    raw_frame.to_pickle(path)
+    frames = [raw_frame, raw_frame.iloc[:10], path]
+    results = list(data.transform_many(frames, workers=2))
+
+    assert [n for n, _ in results] == [0, 1, 2]
+    expected = [data.apply(raw_frame), data.apply(raw_frame.iloc[:10]), data.apply(raw_frame)]
+    for (_, result), transformed in zip(results, expected):
+        assert result.transformed.equals(transformed)
+        assert len(result.step_metadata) == 3
+    assert results[1][1].secondary_results == {"col1_sum": sum(range(1, 11))}
+    assert raw_frame.Col1.tolist() == list(range(100))
+
+
+def test_transform_many_unordered_and_bounded(raw_frame):
+    data = DataSteps()
+    data.step(inc_col1)
+    consumed = []
+
+    def frames():
+        for n in range(6):
+            consumed.append(n)
+            yield raw_frame.iloc[n : n + 1]
+
+    results = data.transform_many(frames(), workers=2, ordered=False, max_in_flight=2)
+    n, result = next(results)
+    assert len(consumed) <= 3
+    assert result.transformed.Col1.tolist() == [n + 1]
+    assert sorted([n] + [m for m, _ in results]) == list(range(6))
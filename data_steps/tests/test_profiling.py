@@ -0,0 +1,93 @@
+import time
+
+import pandas as pd
+import pytest
+
+from data_steps.profiling import StepProfile, fit_scaling, measure, measure_memory
+from data_steps.single_frame import Step
+
+
+def test_measure():
+    def add_rows(frame):
+        time.sleep(0.01)
+        return pd.concat([frame, frame])
+
+    step = Step(priority=1, function=add_rows)
+    (result, secondary_result), measurement = measure(
+        lambda step, data: step.apply(data), step, pd.DataFrame({"a": [1, 2]})
+    )
+    assert len(result) == 4
+    assert secondary_result is None
+    assert measurement["wall_time"] >= 0.01
+    assert measurement["cpu_time"] >= 0
+    assert (measurement["rows_in"], measurement["columns_in"]) == (2, 1)
+    assert (measurement["rows_out"], measurement["columns_out"]) == (4, 1)
+
+
+def test_measure_without_shape():
+    def inc(x):
+        return x + 1
+
+    (result, _), measurement = measure(lambda step, data: step.apply(data), Step(1, inc), 5)
+    assert result == 6
+    assert measurement["rows_in"] is None
+    assert measurement["columns_out"] is None
+
+
+def test_measure_memory():
+    def add_columns(frame):
+        return frame.assign(
+            b=frame["a"] * 2.0, c=frame["a"].astype(str), a=frame["a"].astype("int8")
+        )
+
+    frame = pd.DataFrame({"a": range(10_000)})
+    (result, _), measurement = measure_memory(
+        lambda step, data: step.apply(data), Step(1, add_columns), frame, n_columns=2
+    )
+    assert measurement["bytes_in"] == frame.memory_usage(deep=True, index=False).sum()
+    assert measurement["bytes_out"] == result.memory_usage(deep=True, index=False).sum()
+    assert measurement["bytes_delta"] == measurement["bytes_out"] - measurement["bytes_in"]
+    assert measurement["peak_bytes"] >= 80_000
+    assert list(measurement["largest_column_growth"]) == ["c", "b"]
+
+
+def test_measure_memory_without_frames():
+    def inc(x):
+        return x + 1
+
+    (result, _), measurement = measure_memory(lambda step, data: step.apply(data), Step(1, inc), 5)
+    assert result == 6
+    assert measurement["bytes_in"] is None
+    assert measurement["largest_column_growth"] is None
+
+
+def test_step_profile_accumulates():
+    metadata = pd.DataFrame(
+        {
+            "function_name": ["first", "second"],
+            "wall_time": [1.0, 2.0],
+            "cpu_time": [0.5, 1.0],
+            "rows_in": [10, 10],
+            "columns_in": [2, 2],
+            "rows_out": [10, 5],
+            "columns_out": [2, 3],
+        }
+    )
+    profile = StepProfile()
+    profile.add(metadata)
+    profile.add(metadata)
+    overview = profile.overview(
+        pd.DataFrame({"priority": [1, 2], "function_name": ["first", "third"]})
+    )
+    assert overview["calls"].tolist()[0] == 2
+    assert overview["wall_time"].tolist()[0] == 2.0
+    assert overview["rows_out"].tolist()[0] == 10
+    assert overview["calls"].isna().tolist() == [False, True]
+
+
+def test_fit_scaling():
+    exponent, coefficient = fit_scaling([10, 100, 1000], [0.2, 20, 2000])
+    assert exponent == pytest.approx(2)
+    assert coefficient == pytest.approx(0.002)
+    assert fit_scaling([10, 10], [1.0, 3.0]) == (1.0, pytest.approx(0.2))
+    assert fit_scaling([0, 0], [1.0, 3.0]) == (0.0, 2.0)
@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from data_steps.readers import read_frame
+
+
+@pytest.fixture
+def raw_frame():
+    return pd.DataFrame(
+        {
+            "Col1": [1, 2, 3, 4, 5],
+            "Col2": ["A", "B", "C", "D", "E"],
+            "Col3": [0.01, 0.1, 1, 10, 100],
+        }
+    )
+
+
+def test_read_csv(raw_frame, tmp_path):
+    raw_frame.to_csv(tmp_path / "frame.csv", index=False)
+    assert read_frame(tmp_path / "frame.csv").equals(raw_frame)
+    assert read_frame(str(tmp_path / "frame.csv"), columns=["Col1"]).equals(raw_frame[["Col1"]])
+
+
+def test_read_pickle(raw_frame, tmp_path):
+    raw_frame.to_pickle(tmp_path / "frame.pkl")
+    assert read_frame(tmp_path / "frame.pkl", columns=["Col3"]).equals(raw_frame[["Col3"]])
+
+
+def test_read_parquet(raw_frame, tmp_path):
+    pytest.importorskip("pyarrow")
+    raw_frame.to_parquet(tmp_path / "frame.parquet")
+    assert read_frame(tmp_path / "frame.parquet").equals(raw_frame)
+
+
+def test_read_unsupported(tmp_path):
+    with pytest.raises(ValueError):
+        read_frame(tmp_path / "frame.xlsx")
@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+
+from data_steps.scheduling import build_schedule, merge_column_outputs, required_columns
+from data_steps.single_frame import Step
+
+
+def make_step(name, reads=None, writes=None):
+    def function(frame): ...
+
+    function.__name__ = name
+    return Step(priority=1, function=function, reads=reads, writes=writes)
+
+
+def test_schedule_independent_steps():
+    steps = [
+        make_step("a", reads=["x"], writes=["a"]),
+        make_step("b", reads=["x"], writes=["b"]),
+        make_step("c", reads=["a", "b"], writes=["c"]),
+        make_step("d", reads=["y"], writes=["d"]),
+    ]
+    assert build_schedule(steps) == [[0, 1, 3], [2]]
+
+
+def test_schedule_write_after_read():
+    steps = [
+        make_step("a", reads=["x"], writes=["a"]),
+        make_step("b", reads=["y"], writes=["x"]),
+        make_step("c", reads=["y"], writes=["a"]),
+    ]
+    assert build_schedule(steps) == [[0], [1, 2]]
+
+
+def test_schedule_barriers():
+    steps = [
+        make_step("a", reads=["x"], writes=["a"]),
+        make_step("undeclared"),
+        make_step("b", reads=["x"], writes=["b"]),
+        make_step("c", reads=["x"], writes=["c"]),
+    ]
+    assert build_schedule(steps) == [[0], [1], [2, 3]]
+
+
+def test_merge_column_outputs():
+    data = pd.DataFrame({"x": [1, 2], "y": [3, 4]})
+    steps = [make_step("a", reads=["x"], writes=["a"]), make_step("b", reads=["y"], writes=["y"])]
+    outputs = [data.assign(a=data["x"] * 2), data.assign(y=0)]
+    merged = merge_column_outputs(data, steps, outputs)
+    assert merged.equals(data.assign(a=data["x"] * 2).assign(y=0))
+
+
+def test_merge_undeclared_column():
+    data = pd.DataFrame({"x": [1, 2]})
+    steps = [make_step("a", reads=["x"], writes=["a"])]
+    with pytest.raises(ValueError) as exc_info:
+        merge_column_outputs(data, steps, [data.assign(a=1, b=2)])
+
+    assert "a" in str(exc_info.value)
+
+
+def test_required_columns():
+    steps = [
+        make_step("a", reads=["x", "y"], writes=["a"]),
+        make_step("b", reads=["a", "z"], writes=["x"]),
+        make_step("c", reads=["x", "w"], writes=["c"]),
+    ]
+    assert required_columns(steps) == ["x", "y", "z", "w"]
+    assert required_columns([]) == []
+
+
+def test_required_columns_undeclared():
+    steps = [make_step("a", reads=["x"], writes=["a"]), make_step("undeclared")]
+    with pytest.raises(ValueError) as exc_info:
+        required_columns(steps)
+
+    assert "undeclared" in str(exc_info.value)
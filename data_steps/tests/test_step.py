@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from data_steps.single_frame import Step
@@ -149,3 +151,30 @@ def test_step_name():
         ...
 
     assert Step(priority=1, function=sample_function).name == "sample_function"
+
+
+def test_apply_async_step():
+    async def sum_len(x, offset=0):
+        return sum(x) + offset, len(x)
+
+    step = Step(priority=1, function=sum_len, has_secondary_result=True)
+    step.update_function_kwargs({"offset": 1})
+    assert step.apply([1, 2, 3]) == (7, 3)
+    assert asyncio.run(step.aapply([1, 2, 3])) == (7, 3)
+
+
+def test_apply_async_step_in_event_loop():
+    async def double(x):
+        return 2 * x
+
+    async def apply_in_loop():
+        return Step(priority=1, function=double).apply(2)
+
+    assert asyncio.run(apply_in_loop()) == (4, None)
+
+
+def test_aapply_sync_step():
+    def double(x):
+        return 2 * x
+
+    assert asyncio.run(Step(priority=1, function=double).aapply(2)) == (4, None)
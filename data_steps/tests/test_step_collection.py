@@ -125,3 +125,35 @@ def test_update_step_kwargs():
     assert sc._collection["sample_function"].function_kwargs["a"] == 10
     sc.update_step_kwargs("sample_function", {"a": 30})
     assert sc._collection["sample_function"].function_kwargs["a"] == 30
+
+
+def test_plan_unaffected_by_updates():
+    sc = StepCollection()
+
+    def sample_function(dummy, a=10):
+        pass
+
+    sc._add_step(sample_function, priority=5)
+    plan = sc.plan
+    sc.update_step_kwargs("sample_function", {"a": 30})
+
+    assert plan[0].function_kwargs["a"] == 10
+    assert sc.plan[0].function_kwargs["a"] == 30
+    sc._remove_step(sample_function)
+    assert len(plan) == 1
+    assert sc.plan == ()
+
+
+def test_plan_compiled_once():
+    sc = StepCollection()
+
+    def sample_function(dummy, a=10):
+        return dummy + a
+
+    sc._add_step(sample_function, priority=5)
+    plan = sc.plan
+    assert sc.plan is plan
+    assert sc.ordered_steps is plan
+    sc.update_step_kwargs("sample_function", {"a": 30})
+    assert sc.plan is not plan
+    assert sc.plan[0].apply(1) == (31, None)